@@ -1,37 +1,221 @@
+"""
+Build a user profile interactively, or classify many user records in batch mode.
+
+Interactive (as before):   python mini_profile.py
+Batch:                     python mini_profile.py users.csv -o profiles.ndjson --workers 4
+
+Batch input is CSV (columns `name`/`full_name`, `birth_year`, `hobbies` separated by ';') or
+NDJSON (`{"name": ..., "birth_year": ..., "hobbies": [...]}`). Output is NDJSON, or CSV when the
+output file ends in .csv. Records are processed in chunks, so memory does not depend on file size.
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+CURRENT_YEAR = 2025
+CHUNK_SIZE = 50_000
+
+# Life stages and the first age of every stage after the first one.
+STAGES = ("Not born yet", "Child", "Teenager", "Adult")
+STAGE_STARTS = (0, 13, 20)
+# Precomputed stage for every realistic age; other ages fall back to a bisect over STAGE_STARTS.
+MAX_TABLE_AGE = 150
+STAGE_BY_AGE = tuple(STAGES[bisect_right(STAGE_STARTS, age)] for age in range(MAX_TABLE_AGE + 1))
+
+
 def generate_profile(age):
-    if age in range(0, 13):
-        return str('Child')
-    if age in range(13, 20):
-        return str('Teenager')
-    if age > 20:
-        return str('Adult')
-
-
-full_name = input("Enter your full name: ")
-birth_year_str = input("Enter your birth year: ")
-birth_year = int(birth_year_str)
-current_age = 2025 - birth_year
-hobbies = list()
-while True:
-    hobby = input("Enter a favorite hobby or type 'stop' to finish: ")
-    if hobby.lower() == 'stop':
-        break
-    else:
-        hobbies.append(hobby)
+    if 0 <= age <= MAX_TABLE_AGE:
+        return STAGE_BY_AGE[age]
+    return STAGES[bisect_right(STAGE_STARTS, age)]
+
+
+def parse_lines(input_format, columns, lines):
+    """Yield (name, birth_year, hobbies) from raw CSV lines (with the header's `columns`) or NDJSON lines."""
+    if input_format == "csv":
+        index = {column.strip(): i for i, column in enumerate(columns)}
+        name_i = index.get("name", index.get("full_name"))
+        year_i, hobbies_i = index.get("birth_year"), index.get("hobbies")
+
+        def field(row, i):
+            return row[i] if i is not None and i < len(row) else ""
+
+        for row in csv.reader(lines):
+            if not row:
+                continue
+            hobbies = [h.strip() for h in field(row, hobbies_i).split(";") if h.strip()]
+            yield field(row, name_i), field(row, year_i) or None, hobbies
+        return
+
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        if not isinstance(record, dict):
+            yield "", None, []  # malformed line, counted as skipped
+            continue
+        hobbies = record.get("hobbies") or []
+        if isinstance(hobbies, str):
+            hobbies = [h.strip() for h in hobbies.split(";") if h.strip()]
+        elif not isinstance(hobbies, list) or not all(isinstance(h, str) for h in hobbies):
+            yield "", None, []
+            continue
+        yield record.get("name") or record.get("full_name") or "", record.get("birth_year"), hobbies
+
+
+def parse_birth_year(value):
+    """Birth year as an int, or None if it is not a whole number.
+
+    Strings go through `int()`, so "1990.7" is rejected; a JSON 1990.7 is rejected too instead of
+    being truncated to 1990, and JSON true is not taken for 1.
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def classify_chunk(block, output_format):
+    """Parse one block of input lines and serialize its profiles; return (text, written, skipped)."""
+    out = io.StringIO()
+    writer = csv.writer(out) if output_format == "csv" else None
+    table, table_size = STAGE_BY_AGE, MAX_TABLE_AGE
+    written = skipped = 0
+    for name, birth_year, hobbies in parse_lines(*block):
+        birth_year = parse_birth_year(birth_year)
+        if birth_year is None:
+            skipped += 1
+            continue
+        age = CURRENT_YEAR - birth_year
+        stage = table[age] if 0 <= age <= table_size else generate_profile(age)
+        if writer:
+            writer.writerow((name, age, stage, ";".join(hobbies)))
+        else:
+            out.write(json.dumps({"name": name, "age": age, "stage": stage, "hobbies": hobbies}) + "\n")
+        written += 1
+    return out.getvalue(), written, skipped
 
-life_stage = generate_profile(current_age)
 
-user_profile = dict()
-user_profile["name"] = full_name
-user_profile["age"] = current_age
-user_profile["stage"] = life_stage
-user_profile["hobbies"] = hobbies
+def read_blocks(path, size):
+    """Yield (format, columns, lines) blocks of about `size` raw lines; parsing is left to the workers.
 
-print(
-    f"\n---\nProfile Summary:\nName: {user_profile['name']}\nAge: {user_profile['age']}\nLife Stage: {user_profile['stage']}")
+    A CSV block only ends where the number of quotes seen is even, so quoted fields with
+    newlines are never split. "-" reads NDJSON from stdin.
+    """
+    input_format = "csv" if path.endswith(".csv") else "ndjson"
+    handle = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8")
+    try:
+        columns = next(csv.reader([handle.readline()]), []) if input_format == "csv" else None
+        lines, quotes = [], 0
+        for line in handle:
+            lines.append(line)
+            if input_format == "csv":
+                quotes += line.count('"')
+            if len(lines) >= size and quotes % 2 == 0:
+                yield input_format, columns, lines
+                lines, quotes = [], 0
+        if lines:
+            yield input_format, columns, lines
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
 
-if len(user_profile["hobbies"]) == 0:
-    print("You didn't mention any hobbies")
-else:
-    print(f"Favorite Hobbies ({len(user_profile['hobbies'])}):\n" + "\n".join('- ' + h for h in user_profile['hobbies']))
-print('---')
\ No newline at end of file
+
+def run_batch(paths, output, output_format, chunk_size, workers):
+    """Classify every record of `paths` and write the profiles to `output`; return (written, skipped)."""
+    if output_format == "csv":
+        output.write("name,age,stage,hobbies\r\n")
+    blocks = (block for path in paths for block in read_blocks(path, chunk_size))
+    written = skipped = 0
+
+    def emit(result):
+        nonlocal written, skipped
+        text, block_written, block_skipped = result
+        output.write(text)
+        written += block_written
+        skipped += block_skipped
+
+    if workers <= 1:
+        for block in blocks:
+            emit(classify_chunk(block, output_format))
+        return written, skipped
+
+    # Keep only a few blocks in flight so memory stays bounded; output keeps the input order.
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for block in blocks:
+            pending.append(pool.submit(classify_chunk, block, output_format))
+            if len(pending) >= 2 * workers:
+                emit(pending.popleft().result())
+        while pending:
+            emit(pending.popleft().result())
+    return written, skipped
+
+
+def batch_main(argv):
+    parser = argparse.ArgumentParser(description="Classify user records into profiles.")
+    parser.add_argument("inputs", nargs="+", help="CSV or NDJSON files ('-' for NDJSON on stdin)")
+    parser.add_argument("-o", "--output", default="-", help="output file (.csv for CSV, otherwise NDJSON)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="records per chunk")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes (0 = one per CPU)")
+    args = parser.parse_args(argv)
+
+    output_format = "csv" if args.output.endswith(".csv") else "ndjson"
+    workers = args.workers or os.cpu_count() or 1
+    output = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+    try:
+        written, skipped = run_batch(args.inputs, output, output_format, args.chunk_size, workers)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    print(f"{written} profiles written, {skipped} records skipped (malformed or invalid birth year)", file=sys.stderr)
+
+
+def main():
+    full_name = input("Enter your full name: ")
+    birth_year_str = input("Enter your birth year: ")
+    birth_year = int(birth_year_str)
+    current_age = CURRENT_YEAR - birth_year
+    hobbies = list()
+    while True:
+        hobby = input("Enter a favorite hobby or type 'stop' to finish: ")
+        if hobby.lower() == 'stop':
+            break
+        else:
+            hobbies.append(hobby)
+
+    life_stage = generate_profile(current_age)
+
+    user_profile = dict()
+    user_profile["name"] = full_name
+    user_profile["age"] = current_age
+    user_profile["stage"] = life_stage
+    user_profile["hobbies"] = hobbies
+
+    print(
+        f"\n---\nProfile Summary:\nName: {user_profile['name']}\nAge: {user_profile['age']}\nLife Stage: {user_profile['stage']}")
+
+    if len(user_profile["hobbies"]) == 0:
+        print("You didn't mention any hobbies")
+    else:
+        print(f"Favorite Hobbies ({len(user_profile['hobbies'])}):\n" + "\n".join('- ' + h for h in user_profile['hobbies']))
+    print('---')
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        batch_main(sys.argv[1:])
+    else:
+        main()
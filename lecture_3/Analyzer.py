@@ -1,38 +1,44 @@
-students = []  # a list for storing dictionaries with student data
+import heapq
+import sys
+from collections.abc import Iterator
 
+from report_renderer import ReportRenderer, render_report, render_top_performers
 
-def validate_name(name: str) -> str | None:
+
+def normalize_name(name: str) -> str:
     """
-    Validate a student's name according to predefined rules.
+    Collapse runs of whitespace in a name and strip it at both ends.
 
-    The function checks the given `name` string and returns an error message
-    if validation fails. Otherwise, it returns None.
+    Args:
+        name (str): The name as typed by the user.
+
+    Returns:
+        str: The name with single spaces between words.
+    """
+    return " ".join(name.split())
 
-    Validation rules:
-    - Name must not be empty.
-    - Name length must be at least 2 characters.
-    - Name length must not exceed 50 characters.
-    - Name can only contain letters and spaces.
-    - Name must be unique (no duplicates in the `students` list).
+
+def parse_grade(value: object) -> int | None:
+    """
+    Read a grade typed at the prompt or found in an imported record.
+
+    Strings go through `int()`, so "85.5" is rejected; numbers must be whole, so 85.5 is rejected
+    too instead of being truncated to 85. The 0..100 range is left to the caller.
 
     Args:
-        name (str): The student's name to validate.
+        value (object): The raw grade.
 
     Returns:
-        str | None: An error message if validation fails, otherwise None.
+        int | None: The grade, or None if it is not a whole number.
     """
-    name = " ".join(name.split())
-    if not name:
-        return "Name cannot be empty!"
-    if len(name) < 2:
-        return "Your name is too short!"
-    if len(name) > 50:
-        return "Name must be shorter than 50 symbols!"
-    if not all(ch.isalpha() or ch.isspace() for ch in name):
-        return "Name can only contain letters and spaces!"
-    if any(student["name"].casefold() == name.casefold() for student in students):
-        return "This student already exists!"
-    return None
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
 
 
 def average(grades: list[int]) -> float | None:
@@ -51,20 +57,232 @@ def average(grades: list[int]) -> float | None:
     return sum(grades) / len(grades) if grades else None
 
 
+class StudentRecord:
+    """
+    A student and the running totals of their grades.
+
+    Only the sum and the number of grades are kept, so the average is available
+    in O(1) and a record stays small even with millions of students. `order` is
+    the position in which the student was added; it keeps reports and ties in
+    insertion order.
+
+    Attributes:
+        name (str): The student's name as entered (whitespace normalized).
+        total (int): Sum of all grades.
+        count (int): Number of grades.
+        order (int): Insertion position within the gradebook.
+    """
+    __slots__ = ("name", "total", "count", "order")
+
+    def __init__(self, name: str, order: int) -> None:
+        self.name = name
+        self.total = 0
+        self.count = 0
+        self.order = order
+
+    @property
+    def average(self) -> float | None:
+        """The student's average grade, or None if they have no grades yet."""
+        return self.total / self.count if self.count else None
+
+
+class GradeBook:
+    """
+    Students and their grades, indexed for constant-time lookups.
+
+    Students are stored in a dict keyed by the casefolded name, so duplicate
+    checks and lookups do not scan the whole list. Top performers come from a
+    max-heap of `(-average, order, count, key)` entries: every new grade pushes
+    a fresh entry, and entries whose `count` no longer matches the record are
+    stale and skipped (and dropped when the heap is compacted).
+
+    Workflow:
+    - `add_student()` validates and registers a name.
+    - `add_grade()` updates the running sum and count and pushes a heap entry.
+    - `top_performers()` reads the heap top instead of scanning every student.
+    - Iterating the gradebook yields records in insertion order for reports.
+    """
+
+    def __init__(self) -> None:
+        self._students: dict[str, StudentRecord] = {}
+        self._heap: list[tuple[float, int, int, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._students)
+
+    def __iter__(self) -> Iterator[StudentRecord]:
+        return iter(self._students.values())
+
+    def get(self, name: str) -> StudentRecord | None:
+        """
+        Look up a student by name, ignoring case and extra whitespace.
+
+        Args:
+            name (str): The student's name.
+
+        Returns:
+            StudentRecord | None: The student's record, or None if not found.
+        """
+        return self._students.get(normalize_name(name).casefold())
+
+    def validate_name(self, name: str) -> str | None:
+        """
+        Validate a student's name according to predefined rules.
+
+        The function checks the given `name` string and returns an error message
+        if validation fails. Otherwise, it returns None.
+
+        Validation rules:
+        - Name must not be empty.
+        - Name length must be at least 2 characters.
+        - Name length must not exceed 50 characters.
+        - Name can only contain letters and spaces.
+        - Name must be unique (no duplicates in the gradebook).
+
+        Args:
+            name (str): The student's name to validate.
+
+        Returns:
+            str | None: An error message if validation fails, otherwise None.
+        """
+        name = normalize_name(name)
+        if not name:
+            return "Name cannot be empty!"
+        if len(name) < 2:
+            return "Your name is too short!"
+        if len(name) > 50:
+            return "Name must be shorter than 50 symbols!"
+        if not all(ch.isalpha() or ch.isspace() for ch in name):
+            return "Name can only contain letters and spaces!"
+        if name.casefold() in self._students:
+            return "This student already exists!"
+        return None
+
+    def add_student(self, name: str) -> StudentRecord:
+        """
+        Register a new student with no grades.
+
+        Args:
+            name (str): The student's name; it must pass `validate_name()`.
+
+        Returns:
+            StudentRecord: The new student's record.
+
+        Raises:
+            ValueError: If the name is invalid or already taken.
+        """
+        error = self.validate_name(name)
+        if error:
+            raise ValueError(error)
+        name = normalize_name(name)
+        record = StudentRecord(name, len(self._students))
+        self._students[name.casefold()] = record
+        return record
+
+    def add_grade(self, record: StudentRecord, grade: int) -> None:
+        """
+        Add a grade to a student's running totals.
+
+        Args:
+            record (StudentRecord): The student, as returned by `get()` or `add_student()`.
+            grade (int): A grade between 0 and 100.
+
+        Raises:
+            ValueError: If the grade is outside 0..100.
+        """
+        if not 0 <= grade <= 100:
+            raise ValueError("Grade must be between 0 and 100")
+        record.total += grade
+        record.count += 1
+        heapq.heappush(self._heap, (-record.average, record.order, record.count, record.name.casefold()))
+        # Every grade leaves one stale entry behind; rebuild once they outnumber the live ones.
+        if len(self._heap) > 2 * len(self._students) + 64:
+            self._compact()
+
+    def _is_current(self, entry: tuple[float, int, int, str]) -> bool:
+        record = self._students.get(entry[3])
+        return record is not None and record.count == entry[2]
+
+    def _compact(self) -> None:
+        """Rebuild the heap from the live entries only."""
+        self._heap = [entry for entry in self._heap if self._is_current(entry)]
+        heapq.heapify(self._heap)
+
+    def top_performers(self) -> tuple[list[str], float] | None:
+        """
+        Find the student(s) with the highest average grade.
+
+        Workflow:
+        - Drop stale entries from the top of the heap.
+        - Pop every current entry that shares the top average (ties come out in insertion order).
+        - Push them back so the heap is unchanged for the next call.
+
+        Returns:
+            tuple[list[str], float] | None: The names of the top performers and their
+            average, or None if no student has grades.
+        """
+        heap = self._heap
+        while heap and not self._is_current(heap[0]):
+            heapq.heappop(heap)
+        if not heap:
+            return None
+
+        best = heap[0][0]
+        tied = []
+        while heap and heap[0][0] == best:
+            entry = heapq.heappop(heap)
+            if self._is_current(entry):
+                tied.append(entry)
+        for entry in tied:
+            heapq.heappush(heap, entry)
+        return [self._students[entry[3]].name for entry in tied], -best
+
+    def summary(self) -> tuple[float, float, float] | None:
+        """
+        Summary statistics over the students who have grades.
+
+        Returns:
+            tuple[float, float, float] | None: Maximum, minimum and overall (mean of the
+            averages) grade, or None if no student has grades.
+        """
+        averages = [record.total / record.count for record in self._students.values() if record.count]
+        if not averages:
+            return None
+        return max(averages), min(averages), sum(averages) / len(averages)
+
+
+gradebook = GradeBook()  # all students of the interactive session
+
+
+def validate_name(name: str) -> str | None:
+    """
+    Validate a student's name against the session gradebook.
+
+    See `GradeBook.validate_name()` for the rules.
+
+    Args:
+        name (str): The student's name to validate.
+
+    Returns:
+        str | None: An error message if validation fails, otherwise None.
+    """
+    return gradebook.validate_name(name)
+
+
 def add_student():
     """
     Add a new student to the students list.
 
     The function prompts the user to enter a student's name, validates it using
     `validate_name()`, and if the name passes validation, adds the student to
-    the global `students` list with an empty grades list. If validation fails,
-    an error message is printed and the student is not added.
+    the global `gradebook` with no grades. If validation fails, an error
+    message is printed and the student is not added.
 
     Workflow:
     - Prompt the user for a student's name.
     - Validate the name with `validate_name()`.
     - If validation fails, print the error message and exit.
-    - If validation succeeds, append a new student dictionary to `students`.
+    - If validation succeeds, register the student in `gradebook`.
 
     Returns:
         None
@@ -74,7 +292,7 @@ def add_student():
     if error:
         print(error)
         return
-    students.append({"name": " ".join(learner.split()), "grades": []})
+    gradebook.add_student(learner)
     print(f"Student {learner} added!")
 
 
@@ -83,22 +301,22 @@ def add_grade():
     """
     Add a grade to an existing student.
 
-    The function prompts the user to enter a student's name, searches for the
-    student in the global `students` list, and if found, allows adding a grade
+    The function prompts the user to enter a student's name, looks the student
+    up in the global `gradebook`, and if found, allows adding a grade
     to their record. If the student does not exist, an error message is printed
     and no grade is added.
 
     Workflow:
     - Prompt the user for a student's name.
-    - Search for the student in the `students` list (case-insensitive).
+    - Look up the student in `gradebook` (case-insensitive).
     - If the student is not found, print an error message and exit.
-    - If the student is found, proceed to add a grade to their `grades` list.
+    - If the student is found, proceed to add grades to their record.
 
     Returns:
         None
     """
     learner = input("Enter student's name: ").strip()
-    student = next((s for s in students if s["name"].casefold() == learner.casefold()), None)
+    student = gradebook.get(learner)
     if not student:
         print("Student not found!")
         return
@@ -110,15 +328,15 @@ def add_grade():
         try:
             grade = int(grade)
             if 0 <= grade <= 100:
-                student["grades"].append(grade)
-                print(f"Grade {grade} added for {student['name']}")
+                gradebook.add_grade(student, grade)
+                print(f"Grade {grade} added for {student.name}")
             else:
                 print("Grade must be between 0 and 100")
         except ValueError:
             print("Invalid input. Please enter a number or 'done'")
 
 
-def report():
+def report(top=None, limit=None, renderer=None):
     """
     Generate a report of all students and their average grades.
 
@@ -130,67 +348,51 @@ def report():
 
     Workflow:
     - If no students exist, print a message and exit.
-    - For each student, calculate the average using `average()`.
-    - Print the student's average grade or "N/A" if no grades are present.
-    - Collect valid averages to compute summary statistics.
-    - Print summary statistics if at least one student has grades.
+    - Print each student's running average or "N/A" if no grades are present; with `top` only the
+      best students, with `limit` only the first ones.
+    - Print summary statistics from `GradeBook.summary()` if at least one student has grades.
+
+    The lines are buffered by a `ReportRenderer` and written in large chunks; on a terminal the
+    top and bottom performers are highlighted.
+
+    Args:
+        top (int | None): Only list this many students, best averages first.
+        limit (int | None): Only list the first `limit` students.
+        renderer (ReportRenderer | None): Renderer to add the lines to; the caller closes it.
+            Defaults to a new one writing to stdout.
 
     Returns:
          None
     """
-    if not students:
-        print("No students in the list.")
-        return
-
-    averages = []
-    for s in students:
-        avg = average(s["grades"])
-        if avg is None:
-            print(f"{s['name']}'s average grade is N/A")
-        else:
-            averages.append(avg)
-            print(f"{s['name']}'s average grade is {round(avg, 2)}")
-
-    if averages:
-        print("\nSummary:")
-        print(f"Max average: {round(max(averages), 2)}")
-        print(f"Min average: {round(min(averages), 2)}")
-        print(f"Overall average: {round(sum(averages) / len(averages), 2)}")
-    else:
-        print("\nNo grades available to calculate summary.")
+    out = renderer or ReportRenderer()
+    render_report(gradebook, out, top, limit)
+    if renderer is None:
+        out.close()
 
 
-def find_top_performer():
+def find_top_performer(renderer=None):
     """
     Find and display the student(s) with the highest average grade.
 
-    The function evaluates all students who have at least one grade recorded.
-    It determines the maximum average score and selects all students who share
-    that score. The result is printed to the console.
+    The function asks the gradebook for the maximum average score and all
+    students who share that score. The result is printed to the console.
 
     Workflow:
-    - Filter out students without grades.
-    - If no valid students exist, print a message and exit.
-    - Calculate the maximum average grade among valid students.
-    - Identify all students whose average equals the maximum.
+    - Read the top performer(s) from `GradeBook.top_performers()`.
+    - If no student has grades, print a message and exit.
     - Print the top performer(s) and their average grade.
 
+    Args:
+        renderer (ReportRenderer | None): Renderer to add the lines to; the caller closes it.
+            Defaults to a new one writing to stdout.
+
     Returns:
         None
     """
-    valid_students = [s for s in students if s["grades"]]
-    if not valid_students:
-        print("No grades to evaluate top performer.")
-        return
-
-    top_student = max(valid_students, key=lambda s: average(s["grades"]))
-    max_score = average(top_student["grades"])
-    top_students = [s["name"] for s in valid_students if average(s["grades"]) == max_score]
-
-    if len(top_students) == 1:
-        print(f"The student with the highest average is {top_students[0]} with a grade of {round(max_score, 2)}")
-    else:
-        print(f"Top performers are {', '.join(top_students)} with a grade of {round(max_score, 2)}")
+    out = renderer or ReportRenderer()
+    render_top_performers(gradebook, out)
+    if renderer is None:
+        out.close()
 
 
 def main_menu():
@@ -249,4 +451,18 @@ def main_menu():
             print("You can enter only numbers from 1 to 5")
 
 
-main_menu()
\ No newline at end of file
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--db"] and len(sys.argv) == 3:
+        # Keep students and grades in SQLite (lecture_4 schema) instead of memory.
+        from grade_store import GradeStore
+        gradebook = GradeStore(sys.argv[2])
+        try:
+            main_menu()
+        finally:
+            gradebook.close()
+    elif len(sys.argv) > 1:
+        # Grade files on the command line: run the batch mode instead of the menu.
+        from grade_batch import main as batch_main
+        batch_main(sys.argv[1:])
+    else:
+        main_menu()
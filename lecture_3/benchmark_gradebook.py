@@ -0,0 +1,119 @@
+"""
+Benchmark the indexed GradeBook against the original list-of-dicts storage.
+
+The list version is what Analyzer.py used before: duplicate checks and lookups scan every
+student, and the top performer recomputes averages from the raw grade lists. It is only run
+at a small size (--legacy-students) because it is quadratic; the GradeBook is run at 1M.
+GradeBook timings of add_grade include the amortized cost of compacting the top-performer heap,
+which happens once stale entries outnumber the students, so a short run may or may not hit one.
+
+Run from `lecture_3`:  python benchmark_gradebook.py --students 1000000 --grades 3
+"""
+import argparse
+import random
+import resource
+import string
+import time
+
+from Analyzer import GradeBook, average
+
+
+def make_name(i: int) -> str:
+    """A unique, valid (letters and spaces only) student name for index `i`."""
+    letters = []
+    while True:
+        i, rest = divmod(i, 26)
+        letters.append(string.ascii_lowercase[rest])
+        if not i:
+            break
+    return "Student " + "".join(reversed(letters)).capitalize()
+
+
+def timed(label: str, ops: int, func) -> None:
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<22} {elapsed:8.3f} s  {elapsed / max(ops, 1) * 1e6:9.2f} us/op")
+
+
+def run_gradebook(students: int, grades: int, lookups: int, rng: random.Random) -> None:
+    names = [make_name(i) for i in range(students)]
+    book = GradeBook()
+    records = []
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    print(f"GradeBook, {students:,} students x {grades} grades")
+    timed("add_student", students, lambda: records.extend(book.add_student(name) for name in names))
+
+    def add_grades():
+        for _ in range(grades):
+            for record in records:
+                book.add_grade(record, rng.randint(0, 100))
+    timed("add_grade", students * grades, add_grades)
+
+    probes = [names[rng.randrange(students)].upper() for _ in range(lookups)]
+    timed("lookup (casefold)", lookups, lambda: [book.get(name) for name in probes])
+    timed("validate_name (dup)", lookups, lambda: [book.validate_name(name) for name in probes])
+    timed("top_performers", 1, book.top_performers)
+
+    def interleaved():
+        for name in probes:
+            book.add_grade(book.get(name), 100)
+            book.top_performers()
+    timed("grade + top, repeated", lookups, interleaved)
+    timed("summary (report)", students, book.summary)
+
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"  peak RSS growth         {(rss_after - rss_before) / 1024:8.0f} MiB")
+
+
+def run_legacy(students: int, grades: int, lookups: int, rng: random.Random) -> None:
+    names = [make_name(i) for i in range(students)]
+    rows = []
+    print(f"list of dicts (before), {students:,} students x {grades} grades")
+
+    def add_students():
+        for name in names:
+            if any(s["name"].casefold() == name.casefold() for s in rows):
+                continue
+            rows.append({"name": name, "grades": []})
+    timed("add_student", students, add_students)
+
+    def add_grades():
+        for _ in range(grades):
+            for name in names:
+                student = next(s for s in rows if s["name"].casefold() == name.casefold())
+                student["grades"].append(rng.randint(0, 100))
+    timed("add_grade", students * grades, add_grades)
+
+    def top():
+        valid = [s for s in rows if s["grades"]]
+        best = average(max(valid, key=lambda s: average(s["grades"]))["grades"])
+        return [s["name"] for s in valid if average(s["grades"]) == best]
+    timed("top_performers", 1, top)
+
+    probes = [names[rng.randrange(students)].upper() for _ in range(lookups)]
+
+    def interleaved():
+        for name in probes:
+            next(s for s in rows if s["name"].casefold() == name.casefold())["grades"].append(100)
+            top()
+    timed("grade + top, repeated", lookups, interleaved)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=1_000_000)
+    parser.add_argument("--grades", type=int, default=3, help="grades per student")
+    parser.add_argument("--lookups", type=int, default=10_000)
+    parser.add_argument("--legacy-students", type=int, default=2_000, help="0 skips the list version")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    run_gradebook(args.students, args.grades, args.lookups, random.Random(args.seed))
+    if args.legacy_students:
+        run_legacy(args.legacy_students, args.grades, min(args.lookups, 100), random.Random(args.seed))
+
+
+if __name__ == "__main__":
+    main()
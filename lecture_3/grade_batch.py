@@ -0,0 +1,341 @@
+"""
+Batch (non-interactive) mode of the Student Grade Analyzer.
+
+Reads grade records from CSV (`name,grade` header) or NDJSON (`{"name": ..., "grade": ...}`)
+files in fixed-size chunks and aggregates them with NumPy: per-student sums and counts are
+accumulated with `np.bincount`, so memory grows with the number of distinct students, not with
+the number of grade records. Several files (shards) can be aggregated in a process pool and the
+partial results merged.
+
+Usage (from `lecture_3`):
+    python Analyzer.py grades.csv
+    python grade_batch.py shard_*.ndjson --workers 4 --averages averages.csv
+"""
+import argparse
+import csv
+import json
+import os
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from Analyzer import normalize_name, parse_grade
+
+CHUNK_SIZE = 100_000
+PERCENTILES = (10, 25, 50, 75, 90, 99)
+HISTOGRAM_BINS = np.arange(0, 101, 10)  # 0-10, 10-20, ..., 90-100 (last bin includes 100)
+NAME_COLUMNS = ("name", "student")
+GRADE_COLUMNS = ("grade", "score")
+
+
+class GradeAggregate:
+    """
+    Running per-student grade totals for a stream of grade records.
+
+    Students get a dense integer id the first time they are seen (keyed by the casefolded,
+    whitespace-normalized name, like the interactive gradebook); sums and counts live in
+    NumPy arrays indexed by that id. A 101-bin histogram of the raw grades is kept as well.
+
+    Attributes:
+        names (list[str]): Display name of each student id (first spelling seen).
+        sums (np.ndarray): Sum of grades per student id.
+        counts (np.ndarray): Number of grades per student id.
+        grade_counts (np.ndarray): How many times each grade 0..100 occurred.
+        rejected (int): Records skipped because of an invalid name or grade.
+    """
+
+    def __init__(self) -> None:
+        self.names: list[str] = []
+        self.index: dict[str, int] = {}
+        self._raw_ids: dict[str, int] = {}  # exact spelling -> id, so repeats skip normalization
+        self.sums = np.zeros(0, dtype=np.int64)
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.grade_counts = np.zeros(101, dtype=np.int64)
+        self.rejected = 0
+
+    def _resolve(self, raw: str) -> int:
+        """Id of the student a raw name refers to (registering new students), or -1 if the name is invalid."""
+        name = normalize_name(raw)
+        # After normalization the only whitespace left is single spaces.
+        if not 2 <= len(name) <= 50 or not name.replace(" ", "").isalpha():
+            student_id = -1
+        else:
+            key = name.casefold()
+            student_id = self.index.get(key)
+            if student_id is None:
+                student_id = self.index[key] = len(self.names)
+                self.names.append(name)
+        self._raw_ids[raw] = student_id
+        return student_id
+
+    def _ids_for(self, raw_names: list[str]) -> np.ndarray:
+        """Map raw names to student ids; each distinct spelling is validated only the first time it is seen."""
+        cache = self._raw_ids
+        return np.fromiter(
+            (cache[raw] if raw in cache else self._resolve(raw) for raw in raw_names),
+            dtype=np.int64,
+            count=len(raw_names),
+        )
+
+    def add_chunk(self, raw_names: list[str], raw_grades: list) -> None:
+        """
+        Aggregate one chunk of records.
+
+        Args:
+            raw_names (list[str]): Student names as read from the file.
+            raw_grades (list): Grades as read from the file (strings or numbers).
+        """
+        if not raw_names:
+            return
+        grades = _parse_grades(raw_grades)
+        ids = self._ids_for(raw_names)
+        valid = (ids >= 0) & (grades >= 0) & (grades <= 100)
+        self.rejected += int(len(ids) - np.count_nonzero(valid))
+        ids, grades = ids[valid], grades[valid]
+
+        size = len(self.names)
+        self.sums = _grow(self.sums, size) + np.bincount(ids, weights=grades, minlength=size).astype(np.int64)
+        self.counts = _grow(self.counts, size) + np.bincount(ids, minlength=size)
+        self.grade_counts += np.bincount(grades, minlength=101)
+
+    def merge(self, other: "GradeAggregate") -> None:
+        """Fold the totals of another aggregate (e.g. of another shard) into this one."""
+        ids = self._ids_for(other.names) if other.names else np.zeros(0, dtype=np.int64)
+        size = len(self.names)
+        self.sums = _grow(self.sums, size)
+        self.counts = _grow(self.counts, size)
+        np.add.at(self.sums, ids, other.sums)
+        np.add.at(self.counts, ids, other.counts)
+        self.grade_counts += other.grade_counts
+        self.rejected += other.rejected
+
+    def averages(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Averages of the students who have at least one grade.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Student ids and their average grades.
+        """
+        graded = np.flatnonzero(self.counts)
+        return graded, self.sums[graded] / self.counts[graded]
+
+
+def _grow(array: np.ndarray, size: int) -> np.ndarray:
+    """Pad `array` with zeros up to `size` entries."""
+    return array if len(array) >= size else np.concatenate([array, np.zeros(size - len(array), dtype=array.dtype)])
+
+
+def _parse_grades(raw_grades: list) -> np.ndarray:
+    """
+    Convert grades to int64; values that are not whole numbers in 0..100 become -1.
+
+    Grades are read as by `Analyzer.parse_grade`, the helper behind the menu prompt and the
+    gradebook import: an NDJSON grade of 99.9 is rejected like "99.9" in a CSV file instead of
+    being truncated to 99, 99.0 counts as 99 and JSON true is no grade. Whole arrays of numbers or
+    digit strings are converted in one go; anything else is parsed value by value.
+    """
+    try:
+        values = np.asarray(raw_grades)
+    except ValueError:  # e.g. lists mixed in with numbers
+        values = np.asarray(raw_grades, dtype=object)
+    if values.dtype.kind in "iu":
+        return values.astype(np.int64)
+    if values.dtype.kind == "f":
+        valid = (values == np.floor(values)) & (values >= 0) & (values <= 100)
+        return np.where(valid, values, -1).astype(np.int64)
+    if values.dtype.kind == "U":
+        try:
+            return values.astype(np.int64)
+        except (ValueError, OverflowError):
+            pass
+    parsed = np.empty(len(raw_grades), dtype=np.int64)
+    for i, value in enumerate(raw_grades):
+        grade = parse_grade(value)
+        # Out-of-range grades are rejected by the caller anyway; -1 also keeps huge ones out of int64.
+        parsed[i] = grade if grade is not None and 0 <= grade <= 100 else -1
+    return parsed
+
+
+def iter_chunks(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[tuple[list[str], list]]:
+    """
+    Read `(names, grades)` chunks of at most `chunk_size` records from a CSV or NDJSON file.
+
+    The format is taken from the extension: `.csv` or `.ndjson`/`.jsonl`. CSV files need a
+    header with a name column (`name` or `student`) and a grade column (`grade` or `score`).
+
+    Args:
+        path (str): File to read.
+        chunk_size (int): Maximum number of records per chunk.
+
+    Yields:
+        tuple[list[str], list]: Names and raw grades of one chunk.
+    """
+    names: list[str] = []
+    grades: list = []
+    with open(path, newline="", encoding="utf-8") as handle:
+        if path.endswith(".csv"):
+            reader = csv.reader(handle)
+            header = [column.strip().casefold() for column in next(reader, [])]
+            name_col = next((header.index(c) for c in NAME_COLUMNS if c in header), None)
+            grade_col = next((header.index(c) for c in GRADE_COLUMNS if c in header), None)
+            if name_col is None or grade_col is None:
+                raise ValueError(f"{path}: CSV header needs a name and a grade column")
+            width = max(name_col, grade_col)
+            records = ((row[name_col], row[grade_col]) if len(row) > width else ("", -1) for row in reader)
+        elif path.endswith((".ndjson", ".jsonl")):
+            records = (_ndjson_record(line) for line in handle if line.strip())
+        else:
+            raise ValueError(f"{path}: expected a .csv, .ndjson or .jsonl file")
+
+        for name, grade in records:
+            names.append(name)
+            grades.append(grade)
+            if len(names) >= chunk_size:
+                yield names, grades
+                names, grades = [], []
+    if names:
+        yield names, grades
+
+
+def _ndjson_record(line: str) -> tuple[str, object]:
+    """Name and grade of one NDJSON line; malformed lines come back as an invalid record."""
+    try:
+        record = json.loads(line)
+        name = next(record[c] for c in NAME_COLUMNS if c in record)
+        grade = next(record[c] for c in GRADE_COLUMNS if c in record)
+    except (ValueError, TypeError, StopIteration):
+        return "", -1
+    # JSON true/false would pass for 1/0 and lists or objects are no grades at all.
+    if not isinstance(name, str) or isinstance(grade, bool) or not isinstance(grade, (int, float, str)):
+        return "", -1
+    return name, grade
+
+
+def aggregate_file(path: str, chunk_size: int = CHUNK_SIZE) -> GradeAggregate:
+    """
+    Aggregate one file chunk by chunk.
+
+    Args:
+        path (str): CSV or NDJSON file with grade records.
+        chunk_size (int): Records processed per NumPy step.
+
+    Returns:
+        GradeAggregate: Totals for the file.
+    """
+    aggregate = GradeAggregate()
+    for names, grades in iter_chunks(path, chunk_size):
+        aggregate.add_chunk(names, grades)
+    return aggregate
+
+
+def aggregate_files(paths: list[str], chunk_size: int = CHUNK_SIZE, workers: int = 1) -> GradeAggregate:
+    """
+    Aggregate several files, optionally one shard per worker process.
+
+    Args:
+        paths (list[str]): Files to read; each one is a shard.
+        chunk_size (int): Records processed per NumPy step.
+        workers (int): Size of the process pool; 1 reads the files in this process.
+
+    Returns:
+        GradeAggregate: Totals across all files.
+    """
+    total = GradeAggregate()
+    if workers > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as pool:
+            for partial in pool.map(aggregate_file, paths, [chunk_size] * len(paths)):
+                total.merge(partial)
+    else:
+        for path in paths:
+            total.merge(aggregate_file(path, chunk_size))
+    return total
+
+
+def print_report(aggregate: GradeAggregate) -> None:
+    """
+    Print the batch equivalent of `report()` and `find_top_performer()`.
+
+    Per-student averages are not printed (they can be written with `--averages`); instead the
+    summary is followed by the top performer(s), percentiles and a histogram of the averages.
+
+    Args:
+        aggregate (GradeAggregate): Totals to report on.
+    """
+    ids, averages = aggregate.averages()
+    # Students whose every grade was rejected are known by name but not counted.
+    print(f"Students: {len(ids)}, grades: {int(aggregate.counts.sum())}, rejected: {aggregate.rejected}")
+    if not len(averages):
+        print("\nNo grades available to calculate summary.")
+        return
+
+    print("\nSummary:")
+    print(f"Max average: {round(float(averages.max()), 2)}")
+    print(f"Min average: {round(float(averages.min()), 2)}")
+    print(f"Overall average: {round(float(averages.mean()), 2)}")
+
+    max_score = averages.max()
+    top_students = [aggregate.names[i] for i in ids[averages == max_score]]
+    if len(top_students) == 1:
+        print(f"\nThe student with the highest average is {top_students[0]} with a grade of {round(float(max_score), 2)}")
+    else:
+        shown = ", ".join(top_students[:10]) + (f" and {len(top_students) - 10} more" if len(top_students) > 10 else "")
+        print(f"\nTop performers are {shown} with a grade of {round(float(max_score), 2)}")
+
+    print("\nPercentiles of averages:")
+    for p, value in zip(PERCENTILES, np.percentile(averages, PERCENTILES)):
+        print(f"  p{p:<3} {value:6.2f}")
+    # Percentiles of individual grades come straight from the 0..100 grade counts.
+    cumulative = np.cumsum(aggregate.grade_counts)
+    grade_percentiles = np.searchsorted(cumulative, np.array(PERCENTILES) / 100 * cumulative[-1])
+    print("Percentiles of grades:")
+    print("  " + "  ".join(f"p{p}={int(v)}" for p, v in zip(PERCENTILES, grade_percentiles)))
+
+    print("\nHistogram of averages:")
+    counts, edges = np.histogram(averages, bins=HISTOGRAM_BINS)
+    widest = counts.max() or 1
+    for low, high, count in zip(edges[:-1], edges[1:], counts):
+        bar = "#" * int(round(40 * count / widest))
+        print(f"  {int(low):>3}-{int(high):<3} {count:>10} {bar}")
+
+
+def write_averages(aggregate: GradeAggregate, path: str) -> None:
+    """
+    Write every graded student's average to a CSV file (`name,grades,average`).
+
+    Args:
+        aggregate (GradeAggregate): Totals to write.
+        path (str): Output file.
+    """
+    ids, averages = aggregate.averages()
+    with open(path, "w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["name", "grades", "average"])
+        for start in range(0, len(ids), CHUNK_SIZE):
+            chunk = ids[start:start + CHUNK_SIZE]
+            writer.writerows(
+                (aggregate.names[i], int(count), round(float(avg), 2))
+                for i, count, avg in zip(chunk, aggregate.counts[chunk], averages[start:start + CHUNK_SIZE])
+            )
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Command-line entry point of the batch mode."""
+    parser = argparse.ArgumentParser(description="Analyze grade records from CSV or NDJSON files.")
+    parser.add_argument("files", nargs="+", help="CSV or NDJSON files; several files are treated as shards")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="records aggregated per step")
+    parser.add_argument("--workers", type=int, default=1, help="process pool size for several shards (0 = one per CPU)")
+    parser.add_argument("--averages", metavar="PATH", help="also write per-student averages to a CSV file")
+    args = parser.parse_args(argv)
+
+    try:
+        aggregate = aggregate_files(args.files, args.chunk_size, args.workers or os.cpu_count() or 1)
+    except (OSError, ValueError) as exc:
+        parser.exit(1, f"{exc}\n")
+    print_report(aggregate)
+    if args.averages:
+        write_averages(aggregate, args.averages)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,343 @@
+"""
+SQLite storage for the Student Grade Analyzer.
+
+Students and grades are kept in the `students`/`grades` tables of `lecture_4/queries.sql`, so a
+database built there can be opened here and vice versa. `GradeStore` offers the same methods as
+`Analyzer.GradeBook`, which lets the interactive menu run on top of it:
+
+    python Analyzer.py --db school.db
+
+Two things are added to that schema: a `name_key` column on `students`, the casefolded name with
+a UNIQUE index, which gives the same duplicate check as the menu (NOCASE only folds ASCII), and
+the indexes the lookups and aggregates need. Rows written by other tools get their key when the
+store is opened.
+
+Grades are buffered and written with `executemany` in one transaction per batch. The report and
+the top performer are computed by SQL aggregation over the `(student_id, grade)` index, so
+nothing is loaded into Python at start-up. Bulk import and reports without the menu:
+
+    python grade_store.py school.db import grades.csv more_grades.ndjson
+    python grade_store.py school.db report
+"""
+import argparse
+import sqlite3
+from collections.abc import Iterable, Iterator
+from typing import NamedTuple
+
+from Analyzer import normalize_name, parse_grade
+
+DEFAULT_SUBJECT = "General"  # the analyzer has no subjects; grades are filed under this one
+BATCH_SIZE = 10_000
+
+# Same tables as lecture_4/queries.sql, plus the indexes the analyzer's aggregates need.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS students (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    full_name TEXT NOT NULL,
+    birth_year INTEGER
+);
+CREATE TABLE IF NOT EXISTS grades (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    student_id INTEGER NOT NULL,
+    subject TEXT NOT NULL,
+    grade REAL,
+    FOREIGN KEY (student_id) REFERENCES students(id)
+);
+CREATE INDEX IF NOT EXISTS idx_grades_student_grade ON grades(student_id, grade);
+DROP INDEX IF EXISTS idx_students_full_name;
+"""
+
+# Per-student averages straight from the covering index; students without grades are not included.
+_AVERAGES = "SELECT student_id, AVG(grade) AS average FROM grades WHERE grade IS NOT NULL GROUP BY student_id"
+
+
+class StoredStudent(NamedTuple):
+    """A student row as returned by `GradeStore`; mirrors the fields of `Analyzer.StudentRecord` the menu uses."""
+    id: int
+    name: str
+    average: float | None
+
+
+class GradeStore:
+    """
+    Students and grades persisted in SQLite.
+
+    Workflow:
+    - `add_student()` inserts the student at once (the menu needs the id).
+    - `add_grade()` buffers grades; they are written every `batch_size` grades, before any read
+      and on `close()`.
+    - `__iter__()`, `summary()` and `top_performers()` run aggregate queries.
+
+    Names are looked up by `name_key`, the casefolded name, so "Наталья" and "наталья" are the
+    same student here just as in `GradeBook`.
+
+    Args:
+        path (str): SQLite database file; it is created with the schema if needed.
+        batch_size (int): Number of buffered grades that triggers a write.
+    """
+
+    def __init__(self, path: str, batch_size: int = BATCH_SIZE) -> None:
+        self.batch_size = batch_size
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("PRAGMA cache_size=-65536")  # 64 MiB keeps the indexes hot during imports
+        self.connection.executescript(SCHEMA)
+        self._ensure_name_keys()
+        self._pending: list[tuple[int, str, float]] = []
+
+    def _ensure_name_keys(self) -> None:
+        """Add the `name_key` column and its UNIQUE index if missing, and key the rows that have none.
+
+        Rows that differ from an earlier one only in case keep a NULL key (UNIQUE allows several)
+        and are no longer found by name, as the menu would not have let them in.
+        """
+        columns = {row[1] for row in self.connection.execute("PRAGMA table_info(students)")}
+        self.connection.create_function("name_key", 1, _name_key, deterministic=True)
+        with self.connection:
+            if "name_key" not in columns:
+                self.connection.execute("ALTER TABLE students ADD COLUMN name_key TEXT")
+            self.connection.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_students_name_key ON students(name_key)")
+            self.connection.execute("UPDATE OR IGNORE students SET name_key = name_key(full_name) WHERE name_key IS NULL")
+
+    def close(self) -> None:
+        """Write buffered grades and close the database."""
+        self.flush()
+        self.connection.close()
+
+    def __enter__(self) -> "GradeStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def flush(self) -> None:
+        """Write all buffered grades in one transaction."""
+        if not self._pending:
+            return
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO grades (student_id, subject, grade) VALUES (?, ?, ?)", self._pending
+            )
+        self._pending.clear()
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM students").fetchone()[0]
+
+    def get(self, name: str) -> StoredStudent | None:
+        """
+        Look up a student by name, ignoring case and extra whitespace.
+
+        Args:
+            name (str): The student's name.
+
+        Returns:
+            StoredStudent | None: The student, or None if not found.
+        """
+        self.flush()
+        row = self.connection.execute(
+            "SELECT s.id, s.full_name, (SELECT AVG(grade) FROM grades WHERE student_id = s.id) "
+            "FROM students AS s WHERE s.name_key = ?",
+            (_name_key(name),),
+        ).fetchone()
+        return StoredStudent(*row) if row else None
+
+    def validate_name(self, name: str) -> str | None:
+        """
+        Validate a student's name with the same rules as `GradeBook.validate_name()`.
+
+        Args:
+            name (str): The student's name to validate.
+
+        Returns:
+            str | None: An error message if validation fails, otherwise None.
+        """
+        name = normalize_name(name)
+        if not name:
+            return "Name cannot be empty!"
+        if len(name) < 2:
+            return "Your name is too short!"
+        if len(name) > 50:
+            return "Name must be shorter than 50 symbols!"
+        if not all(ch.isalpha() or ch.isspace() for ch in name):
+            return "Name can only contain letters and spaces!"
+        if self.connection.execute("SELECT 1 FROM students WHERE name_key = ?", (_name_key(name),)).fetchone():
+            return "This student already exists!"
+        return None
+
+    def add_student(self, name: str, birth_year: int | None = None) -> StoredStudent:
+        """
+        Insert a new student.
+
+        Args:
+            name (str): The student's name; it must pass `validate_name()`.
+            birth_year (int | None): Optional birth year (the analyzer does not ask for it).
+
+        Returns:
+            StoredStudent: The new student.
+
+        Raises:
+            ValueError: If the name is invalid or already taken.
+        """
+        error = self.validate_name(name)
+        if error:
+            raise ValueError(error)
+        name = normalize_name(name)
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO students (full_name, birth_year, name_key) VALUES (?, ?, ?)",
+                (name, birth_year, _name_key(name)),
+            )
+        return StoredStudent(cursor.lastrowid, name, None)
+
+    def add_grade(self, student: StoredStudent, grade: int, subject: str = DEFAULT_SUBJECT) -> None:
+        """
+        Buffer a grade for a student.
+
+        Args:
+            student (StoredStudent): The student, as returned by `get()` or `add_student()`.
+            grade (int): A grade between 0 and 100.
+            subject (str): Subject the grade belongs to.
+
+        Raises:
+            ValueError: If the grade is outside 0..100.
+        """
+        if not 0 <= grade <= 100:
+            raise ValueError("Grade must be between 0 and 100")
+        self._pending.append((student.id, subject, grade))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def import_grades(self, records: Iterable[tuple[str, int]]) -> tuple[int, int]:
+        """
+        Add many `(name, grade)` records, creating students as they appear.
+
+        Invalid names and grades are skipped; a grade must be a whole number, as at the menu
+        prompt. Student ids are cached by casefolded name for the duration of the import, so each
+        student is looked up in the database once.
+
+        Args:
+            records (Iterable[tuple[str, int]]): Names and grades, e.g. from `grade_batch.iter_chunks()`.
+
+        Returns:
+            tuple[int, int]: Number of imported and skipped records.
+        """
+        ids: dict[str, int] = {}
+        imported = skipped = 0
+        for raw_name, raw_grade in records:
+            grade = parse_grade(raw_grade)
+            if grade is None or not 0 <= grade <= 100:
+                skipped += 1
+                continue
+            name = normalize_name(raw_name)
+            key = name.casefold()
+            student_id = ids.get(key)
+            if student_id is None:
+                student_id = self._import_student(name, key)
+                if student_id is None:
+                    skipped += 1
+                    continue
+                ids[key] = student_id
+            self._pending.append((student_id, DEFAULT_SUBJECT, grade))
+            imported += 1
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+        self.flush()
+        return imported, skipped
+
+    def _import_student(self, name: str, key: str) -> int | None:
+        """Id of an existing or newly inserted student, or None for an invalid name.
+
+        The insert joins the open batch transaction instead of committing on its own.
+        """
+        row = self.connection.execute("SELECT id FROM students WHERE name_key = ?", (key,)).fetchone()
+        if row:
+            return row[0]
+        if self.validate_name(name) is not None:
+            return None
+        return self.connection.execute(
+            "INSERT INTO students (full_name, name_key) VALUES (?, ?)", (name, key)
+        ).lastrowid
+
+    def __iter__(self) -> Iterator[StoredStudent]:
+        """Every student with their average (None without grades), in insertion order."""
+        self.flush()
+        cursor = self.connection.execute(
+            f"SELECT s.id, s.full_name, a.average FROM students AS s "
+            f"LEFT JOIN ({_AVERAGES}) AS a ON a.student_id = s.id ORDER BY s.id"
+        )
+        return (StoredStudent(*row) for row in cursor)
+
+    def summary(self) -> tuple[float, float, float] | None:
+        """
+        Summary statistics over the students who have grades.
+
+        Returns:
+            tuple[float, float, float] | None: Maximum, minimum and overall (mean of the
+            averages) grade, or None if no student has grades.
+        """
+        self.flush()
+        row = self.connection.execute(
+            f"SELECT MAX(average), MIN(average), AVG(average) FROM ({_AVERAGES})"
+        ).fetchone()
+        return None if row[0] is None else row
+
+    def top_performers(self) -> tuple[list[str], float] | None:
+        """
+        Find the student(s) with the highest average grade.
+
+        Returns:
+            tuple[list[str], float] | None: The names of the top performers and their
+            average, or None if no student has grades.
+        """
+        self.flush()
+        rows = self.connection.execute(
+            f"WITH averages AS ({_AVERAGES}) "
+            f"SELECT s.full_name, a.average FROM averages AS a JOIN students AS s ON s.id = a.student_id "
+            f"WHERE a.average = (SELECT MAX(average) FROM averages) ORDER BY s.id"
+        ).fetchall()
+        if not rows:
+            return None
+        return [name for name, _ in rows], rows[0][1]
+
+
+def _name_key(name: str) -> str:
+    """Lookup key of a name: normalized and casefolded, as `GradeBook` keys its students."""
+    return normalize_name(name).casefold()
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Command-line entry point: import grade files into a database or print its report."""
+    parser = argparse.ArgumentParser(description="Persist and report grades in a SQLite database.")
+    parser.add_argument("database", help="SQLite file using the lecture_4 students/grades schema")
+    commands = parser.add_subparsers(dest="command", required=True)
+    import_parser = commands.add_parser("import", help="import CSV or NDJSON grade files")
+    import_parser.add_argument("files", nargs="+")
+    report_parser = commands.add_parser("report", help="print the report and the top performer(s)")
+    report_parser.add_argument("--top", type=int, help="only list the N students with the best averages")
+    report_parser.add_argument("--limit", type=int, help="only list the first N students")
+    report_parser.add_argument("--pager", action="store_true", help="page the report with $PAGER (less -R)")
+    report_parser.add_argument("--color", choices=("auto", "always", "never"), default="auto",
+                               help="highlight top and bottom performers (auto: only on a terminal)")
+    args = parser.parse_args(argv)
+
+    with GradeStore(args.database) as store:
+        if args.command == "import":
+            from grade_batch import iter_chunks
+
+            for path in args.files:
+                records = (record for names, grades in iter_chunks(path) for record in zip(names, grades))
+                imported, skipped = store.import_grades(records)
+                print(f"{path}: imported {imported} grades, skipped {skipped}")
+        else:
+            from report_renderer import ReportRenderer, render_report, render_top_performers
+
+            # One renderer for both parts, so a pager shows the whole report.
+            with ReportRenderer(color=args.color, pager=args.pager) as out:
+                render_report(store, out, args.top, args.limit)
+                out.line()
+                render_top_performers(store, out)
+
+
+if __name__ == "__main__":
+    main()
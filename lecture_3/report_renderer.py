@@ -0,0 +1,204 @@
+"""
+Buffered, optionally coloured output for the Student Grade Analyzer reports.
+
+`report()` used to call `print()` once per student. `ReportRenderer` collects lines in memory and
+writes them in large chunks, optionally through a pager, and highlights the top and bottom
+performers with colorama (as in `lecture_1/my_project/main.py`). Colour is switched off
+automatically when the output is not a terminal, so reports redirected to a file or a pipe stay
+plain text and fast.
+"""
+import heapq
+import os
+import shlex
+import shutil
+import subprocess
+import sys
+from typing import TextIO
+
+try:
+    from colorama import Fore, Style, just_fix_windows_console
+except ImportError:  # colour is optional
+    Fore = Style = None
+
+CHUNK_LINES = 8192
+
+# Line styles; each maps to a colorama prefix when colour is on.
+TOP, BOTTOM, MUTED = "top", "bottom", "muted"
+
+
+class ReportRenderer:
+    """
+    Collect report lines and write them in large chunks.
+
+    Workflow:
+    - `line()` appends a line (optionally styled) to the buffer.
+    - Every `chunk_lines` lines the buffer is joined and written with a single `write()`.
+    - `close()` (or leaving the `with` block) writes the rest and waits for the pager.
+
+    Args:
+        stream (TextIO | None): Where to write; defaults to `sys.stdout`.
+        color (str): "auto" (colour only on a terminal), "always" or "never".
+        pager (bool): Pipe the output through `$PAGER` (default `less -R`) when stdout is a terminal.
+        chunk_lines (int): Number of buffered lines per write.
+    """
+
+    def __init__(self, stream: TextIO | None = None, color: str = "auto", pager: bool = False,
+                 chunk_lines: int = CHUNK_LINES) -> None:
+        self.stream = stream or sys.stdout
+        self.chunk_lines = chunk_lines
+        self._lines: list[str] = []
+        self._pager = None
+        if pager and self.stream is sys.stdout and sys.stdout.isatty():
+            self._pager = _open_pager()
+            if self._pager:
+                self.stream = self._pager.stdin
+
+        if color == "auto":
+            # A pager started by us shows our colours on the terminal behind it.
+            use_color = (self._pager is not None or self.stream.isatty()) and "NO_COLOR" not in os.environ
+        else:
+            use_color = color == "always"
+        self.styles = {}
+        if use_color and Fore is not None:
+            # autoreset (as in lecture_1) only works per print(); buffered lines reset explicitly.
+            just_fix_windows_console()
+            self.styles = {
+                TOP: Fore.GREEN + Style.BRIGHT,
+                BOTTOM: Fore.RED,
+                MUTED: Style.DIM,
+            }
+        self._reset = Style.RESET_ALL if self.styles else ""
+        self._closed = False
+
+    def __enter__(self) -> "ReportRenderer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def line(self, text: str = "", style: str | None = None) -> None:
+        """
+        Add one line to the report.
+
+        Args:
+            text (str): The line, without a trailing newline.
+            style (str | None): TOP, BOTTOM or MUTED to highlight the line when colour is on.
+        """
+        prefix = self.styles.get(style) if style else None
+        self._lines.append(f"{prefix}{text}{self._reset}" if prefix else text)
+        if len(self._lines) >= self.chunk_lines:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the buffered lines with one `write()` call."""
+        if not self._lines or self._closed:
+            return
+        chunk = "\n".join(self._lines) + "\n"
+        self._lines.clear()
+        try:
+            self.stream.write(chunk)
+        except BrokenPipeError:
+            # The reader went away (pager quit, `| head`); drop the rest of the report.
+            self._closed = True
+
+    def close(self) -> None:
+        """Write the remaining lines and, with a pager, wait until the user quits it."""
+        self.flush()
+        self._closed = True
+        if self._pager:
+            try:
+                self._pager.stdin.close()
+            except BrokenPipeError:
+                pass
+            self._pager.wait()
+        else:
+            try:
+                self.stream.flush()
+            except BrokenPipeError:
+                pass
+
+
+def _open_pager() -> subprocess.Popen | None:
+    """Start `$PAGER` (or `less -R`) reading from a pipe, or return None if it is not installed."""
+    command = shlex.split(os.environ.get("PAGER") or "less -R")
+    if not command or shutil.which(command[0]) is None:
+        return None
+    return subprocess.Popen(command, stdin=subprocess.PIPE, text=True, encoding="utf-8")
+
+
+def _style(average: float, summary: tuple[float, float, float]) -> str | None:
+    max_avg, min_avg, _ = summary
+    if average == max_avg:
+        return TOP
+    if average == min_avg:
+        return BOTTOM
+    return None
+
+
+def render_report(book, out: ReportRenderer, top: int | None = None, limit: int | None = None) -> None:
+    """
+    Render the report of `report()` for a `GradeBook` or `GradeStore`.
+
+    Workflow:
+    - If no students exist, write a message and exit.
+    - Write one line per student (top and bottom performers highlighted), either all of them,
+      the first `limit` in insertion order, or the `top` students with the highest averages.
+    - Write the summary statistics if at least one student has grades.
+
+    Args:
+        book: The students, as `Analyzer.GradeBook` or `grade_store.GradeStore`.
+        out (ReportRenderer): Where the report goes.
+        top (int | None): Only list this many students, best averages first.
+        limit (int | None): Only list the first `limit` students.
+    """
+    if not book:
+        out.line("No students in the list.")
+        return
+
+    summary = book.summary()
+    if top is not None:
+        students = heapq.nlargest(top, (s for s in book if s.average is not None), key=lambda s: s.average)
+        hidden = 0
+    else:
+        students = book
+        hidden = max(len(book) - limit, 0) if limit is not None else 0
+
+    for shown, s in enumerate(students):
+        if limit is not None and top is None and shown >= limit:
+            break
+        avg = s.average
+        if avg is None:
+            out.line(f"{s.name}'s average grade is N/A", MUTED)
+        else:
+            out.line(f"{s.name}'s average grade is {round(avg, 2)}", _style(avg, summary))
+    if hidden:
+        out.line(f"... and {hidden} more students", MUTED)
+
+    if summary:
+        max_avg, min_avg, overall = summary
+        out.line("\nSummary:")
+        out.line(f"Max average: {round(max_avg, 2)}", TOP)
+        out.line(f"Min average: {round(min_avg, 2)}", BOTTOM)
+        out.line(f"Overall average: {round(overall, 2)}")
+    else:
+        out.line("\nNo grades available to calculate summary.")
+
+
+def render_top_performers(book, out: ReportRenderer) -> None:
+    """
+    Render the result of `find_top_performer()` for a `GradeBook` or `GradeStore`.
+
+    Args:
+        book: The students, as `Analyzer.GradeBook` or `grade_store.GradeStore`.
+        out (ReportRenderer): Where the result goes.
+    """
+    top = book.top_performers()
+    if top is None:
+        out.line("No grades to evaluate top performer.")
+        return
+
+    top_students, max_score = top
+    if len(top_students) == 1:
+        out.line(f"The student with the highest average is {top_students[0]} with a grade of {round(max_score, 2)}", TOP)
+    else:
+        out.line(f"Top performers are {', '.join(top_students)} with a grade of {round(max_score, 2)}", TOP)
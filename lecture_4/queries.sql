@@ -14,6 +14,82 @@ create TABLE IF NOT EXISTS grades (
     FOREIGN KEY (student_id) REFERENCES students(id)
 );
 
+-- Index for joins and per-student averages (grade makes it covering for AVG)
+CREATE INDEX IF NOT EXISTS idx_grades_student_grade ON grades(student_id, grade);
+
+-- Index for per-subject averages
+CREATE INDEX IF NOT EXISTS idx_grades_subject_grade ON grades(subject, grade);
+
+-- Summary tables: sum and count of grades per student and per subject, kept exact by the triggers below.
+-- NULL grades are ignored, like AVG() does; a row disappears when its last grade is removed.
+-- Create table 'student_grade_stats'
+CREATE TABLE IF NOT EXISTS student_grade_stats (
+    student_id INTEGER PRIMARY KEY,         -- Link to student's ID
+    grade_sum REAL NOT NULL,                -- Sum of the student's grades
+    grade_count INTEGER NOT NULL,           -- Number of grades
+    average_grade REAL GENERATED ALWAYS AS (grade_sum / grade_count) VIRTUAL,
+    FOREIGN KEY (student_id) REFERENCES students(id)
+);
+
+-- Create table 'subject_grade_stats'
+CREATE TABLE IF NOT EXISTS subject_grade_stats (
+    subject TEXT PRIMARY KEY,               -- Name of subject
+    grade_sum REAL NOT NULL,                -- Sum of the subject's grades
+    grade_count INTEGER NOT NULL,           -- Number of grades
+    average_grade REAL GENERATED ALWAYS AS (grade_sum / grade_count) VIRTUAL
+);
+
+-- Indexes on the averages, for top-N queries
+CREATE INDEX IF NOT EXISTS idx_student_grade_stats_average ON student_grade_stats(average_grade);
+
+CREATE INDEX IF NOT EXISTS idx_subject_grade_stats_average ON subject_grade_stats(average_grade);
+
+-- Keep the summary tables in sync with every insert
+CREATE TRIGGER IF NOT EXISTS grades_stats_ai AFTER INSERT ON grades
+WHEN new.grade IS NOT NULL
+BEGIN
+    INSERT INTO student_grade_stats (student_id, grade_sum, grade_count) VALUES (new.student_id, new.grade, 1)
+    ON CONFLICT (student_id) DO UPDATE SET grade_sum = grade_sum + excluded.grade_sum, grade_count = grade_count + 1;
+    INSERT INTO subject_grade_stats (subject, grade_sum, grade_count) VALUES (new.subject, new.grade, 1)
+    ON CONFLICT (subject) DO UPDATE SET grade_sum = grade_sum + excluded.grade_sum, grade_count = grade_count + 1;
+END;
+
+-- ... every delete
+CREATE TRIGGER IF NOT EXISTS grades_stats_ad AFTER DELETE ON grades
+WHEN old.grade IS NOT NULL
+BEGIN
+    UPDATE student_grade_stats SET grade_sum = grade_sum - old.grade, grade_count = grade_count - 1
+    WHERE student_id = old.student_id;
+    DELETE FROM student_grade_stats WHERE student_id = old.student_id AND grade_count = 0;
+    UPDATE subject_grade_stats SET grade_sum = grade_sum - old.grade, grade_count = grade_count - 1
+    WHERE subject = old.subject;
+    DELETE FROM subject_grade_stats WHERE subject = old.subject AND grade_count = 0;
+END;
+
+-- ... and every update (remove the old values, add the new ones)
+CREATE TRIGGER IF NOT EXISTS grades_stats_au AFTER UPDATE OF student_id, subject, grade ON grades
+BEGIN
+    UPDATE student_grade_stats SET grade_sum = grade_sum - old.grade, grade_count = grade_count - 1
+    WHERE student_id = old.student_id AND old.grade IS NOT NULL;
+    DELETE FROM student_grade_stats WHERE student_id = old.student_id AND grade_count = 0;
+    UPDATE subject_grade_stats SET grade_sum = grade_sum - old.grade, grade_count = grade_count - 1
+    WHERE subject = old.subject AND old.grade IS NOT NULL;
+    DELETE FROM subject_grade_stats WHERE subject = old.subject AND grade_count = 0;
+    INSERT INTO student_grade_stats (student_id, grade_sum, grade_count)
+    SELECT new.student_id, new.grade, 1 WHERE new.grade IS NOT NULL
+    ON CONFLICT (student_id) DO UPDATE SET grade_sum = grade_sum + excluded.grade_sum, grade_count = grade_count + 1;
+    INSERT INTO subject_grade_stats (subject, grade_sum, grade_count)
+    SELECT new.subject, new.grade, 1 WHERE new.grade IS NOT NULL
+    ON CONFLICT (subject) DO UPDATE SET grade_sum = grade_sum + excluded.grade_sum, grade_count = grade_count + 1;
+END;
+
+-- Backfill the summary tables for grades that existed before the triggers (no-op afterwards)
+INSERT OR IGNORE INTO student_grade_stats (student_id, grade_sum, grade_count)
+SELECT student_id, SUM(grade), COUNT(grade) FROM grades WHERE grade IS NOT NULL GROUP BY student_id;
+
+INSERT OR IGNORE INTO subject_grade_stats (subject, grade_sum, grade_count)
+SELECT subject, SUM(grade), COUNT(grade) FROM grades WHERE grade IS NOT NULL GROUP BY subject;
+
 -- 2. Insert sample data
 -- Insert students
 insert into students (full_name, birth_year)
@@ -93,4 +169,48 @@ LIMIT 3;
 SELECT DISTINCT s.full_name
 FROM students AS s
 JOIN grades AS g ON s.id = g.student_id
-WHERE g.grade < 80;
\ No newline at end of file
+WHERE g.grade < 80;
+
+-- 4b. Average grade per student from the summary table (one row per student ID, no GROUP BY)
+SELECT s.full_name, st.average_grade
+FROM student_grade_stats AS st
+JOIN students AS s ON s.id = st.student_id;
+
+-- 6b. Average grade per subject from the summary table
+SELECT subject, average_grade
+FROM subject_grade_stats
+ORDER BY subject;
+
+-- 7b. Top-3 students by average grade, read from the average index
+SELECT s.full_name, st.average_grade
+FROM student_grade_stats AS st
+JOIN students AS s ON s.id = st.student_id
+ORDER BY st.average_grade DESC
+LIMIT 3;
+
+-- 9. Verify the summary tables against the raw grades (no rows means they match). The sums are REAL and
+--    the triggers add and subtract grades one at a time, so sums are compared with a relative tolerance.
+WITH raw_students AS (
+    SELECT student_id, SUM(grade) AS grade_sum, COUNT(grade) AS grade_count
+    FROM grades WHERE grade IS NOT NULL GROUP BY student_id
+), raw_subjects AS (
+    SELECT subject, SUM(grade) AS grade_sum, COUNT(grade) AS grade_count
+    FROM grades WHERE grade IS NOT NULL GROUP BY subject
+)
+SELECT 'student_grade_stats: missing or wrong' AS problem, r.student_id, r.grade_sum, r.grade_count
+FROM raw_students AS r LEFT JOIN student_grade_stats AS k ON k.student_id = r.student_id
+WHERE k.student_id IS NULL OR k.grade_count <> r.grade_count
+   OR ABS(k.grade_sum - r.grade_sum) > 1e-9 * MAX(1, ABS(r.grade_sum))
+UNION ALL
+SELECT 'student_grade_stats: stale', k.student_id, k.grade_sum, k.grade_count
+FROM student_grade_stats AS k LEFT JOIN raw_students AS r ON r.student_id = k.student_id
+WHERE r.student_id IS NULL
+UNION ALL
+SELECT 'subject_grade_stats: missing or wrong', r.subject, r.grade_sum, r.grade_count
+FROM raw_subjects AS r LEFT JOIN subject_grade_stats AS k ON k.subject = r.subject
+WHERE k.subject IS NULL OR k.grade_count <> r.grade_count
+   OR ABS(k.grade_sum - r.grade_sum) > 1e-9 * MAX(1, ABS(r.grade_sum))
+UNION ALL
+SELECT 'subject_grade_stats: stale', k.subject, k.grade_sum, k.grade_count
+FROM subject_grade_stats AS k LEFT JOIN raw_subjects AS r ON r.subject = k.subject
+WHERE r.subject IS NULL;
@@ -1,16 +1,183 @@
+"""
+Run queries.sql against school.db one statement at a time.
+
+Every statement is timed; SELECTs also report their row count, the first rows and the
+EXPLAIN QUERY PLAN output. The `load` command fills the database with synthetic students
+and grades so the example queries can be measured on millions of rows.
+
+Usage (from `lecture_4`):
+    python skript.py                          # run all of queries.sql, like before
+    python skript.py load --students 1000000  # add 1M students with 10 grades each
+    python skript.py run --select-only        # time only the example queries
+"""
+import argparse
+import random
+import re
 import sqlite3
+import time
+
+DB_PATH = "school.db"
+SQL_PATH = "queries.sql"
+
+FIRST_NAMES = ["Alice", "Brian", "Carla", "Daniel", "Eva", "Felix", "Grace", "Henry", "Isabella", "Jack",
+               "Karen", "Leo", "Maria", "Nina", "Oscar", "Paula", "Quentin", "Rosa", "Sam", "Tina"]
+LAST_NAMES = ["Johnson", "Smith", "Reyes", "Kim", "Thompson", "Nguyen", "Patel", "Lopez", "Martinez",
+              "Brown", "Garcia", "Miller", "Davis", "Wilson", "Moore", "Clark", "Lewis", "Walker"]
+SUBJECTS = ["Math", "English", "Science", "History", "Art", "Physical Education"]
+
+# INSERT ... VALUES statements are sample data; INSERT ... SELECT statements (backfills) are schema.
+SAMPLE_INSERT_RE = re.compile(r"INSERT\s+INTO\s+\w+\s*\([^)]*\)\s*VALUES", re.IGNORECASE)
+
+
+def split_statements(script: str) -> list[tuple[str, str]]:
+    """
+    Split an SQL script into `(label, statement)` pairs.
+
+    `sqlite3.complete_statement` decides where a statement ends, so semicolons inside strings
+    and trigger bodies do not split it. The label is the last comment line before the statement,
+    or the start of the statement itself when it has no comment.
+    """
+    statements = []
+    label, buffer = "", ""
+    for line in script.splitlines(keepends=True):
+        if not buffer and line.strip().startswith("--"):
+            label = line.strip().lstrip("-").strip()
+            continue
+        if not buffer and not line.strip():
+            continue
+        buffer += line
+        if sqlite3.complete_statement(buffer):
+            statements.append((label or " ".join(buffer.split())[:70], buffer.strip()))
+            label, buffer = "", ""
+    if buffer.strip():
+        statements.append((label or " ".join(buffer.split())[:70], buffer.strip()))
+    return statements
+
+
+def is_select(statement: str) -> bool:
+    """True for read-only statements (SELECT or WITH ... SELECT), after leading comments."""
+    code = re.sub(r"--[^\n]*", "", statement).lstrip().upper()
+    return code.startswith(("SELECT", "WITH"))
+
+
+def run_statement(conn: sqlite3.Connection, label: str, statement: str, show: int, explain: bool) -> float:
+    """Execute one statement, print its timing, result size, plan and first rows; return the wall time."""
+    print(f"\n[{label}]")
+    plan = []
+    if explain and is_select(statement):
+        plan = [row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {statement}")]
+
+    start = time.perf_counter()
+    cursor = conn.execute(statement)
+    rows = cursor.fetchall()
+    elapsed = time.perf_counter() - start
+
+    if is_select(statement):
+        print(f"    {elapsed * 1000:10.2f} ms  {len(rows)} rows")
+    else:
+        print(f"    {elapsed * 1000:10.2f} ms  {max(cursor.rowcount, 0)} rows changed")
+    for step in plan:
+        print(f"    plan: {step}")
+    for row in rows[:show]:
+        print(f"    {row}")
+    if len(rows) > show > 0:
+        print(f"    ... {len(rows) - show} more")
+    return elapsed
+
+
+def run(conn: sqlite3.Connection, sql_path: str, select_only: bool, show: int, explain: bool) -> None:
+    """Run the statements of `sql_path` one by one and print a timing summary."""
+    with open(sql_path, "r", encoding="utf-8") as f:
+        statements = split_statements(f.read())
+
+    timings = []
+    for label, statement in statements:
+        if select_only and not is_select(statement):
+            continue
+        timings.append((label, run_statement(conn, label, statement, show, explain)))
+        # save changes after every write, like executescript did at the end
+        conn.commit()
+
+    print("\nSummary:")
+    for label, elapsed in timings:
+        print(f"    {elapsed * 1000:10.2f} ms  {label[:70]}")
+    print(f"    {sum(t for _, t in timings) * 1000:10.2f} ms  total")
+
+
+def ensure_schema(conn: sqlite3.Connection, sql_path: str) -> None:
+    """Run the schema part of the script: tables, indexes, triggers and backfills, but no sample rows or queries."""
+    with open(sql_path, "r", encoding="utf-8") as f:
+        for _, statement in split_statements(f.read()):
+            if is_select(statement) or SAMPLE_INSERT_RE.match(re.sub(r"--[^\n]*", "", statement).lstrip()):
+                continue
+            conn.execute(statement)
+    conn.commit()
+
+
+def load(conn: sqlite3.Connection, students: int, grades_per_student: int, batch_size: int, seed: int) -> None:
+    """
+    Append synthetic students and their grades with executemany, one transaction per batch of students.
+
+    Student ids are assigned explicitly after the current maximum so the grades can refer to them
+    without reading anything back.
+    """
+    rng = random.Random(seed)
+    next_id = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM students").fetchone()[0]
+    start = time.perf_counter()
+    loaded = 0
+    while loaded < students:
+        count = min(batch_size, students - loaded)
+        ids = range(next_id, next_id + count)
+        student_rows = [
+            (i, f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}", rng.randint(2000, 2008)) for i in ids
+        ]
+        grade_rows = [
+            (i, rng.choice(SUBJECTS), float(rng.randint(50, 100))) for i in ids for _ in range(grades_per_student)
+        ]
+        with conn:
+            conn.executemany("INSERT INTO students (id, full_name, birth_year) VALUES (?, ?, ?)", student_rows)
+            conn.executemany("INSERT INTO grades (student_id, subject, grade) VALUES (?, ?, ?)", grade_rows)
+        next_id += count
+        loaded += count
+        elapsed = time.perf_counter() - start
+        print(f"\r{loaded} students, {loaded * grades_per_student} grades, "
+              f"{loaded * (grades_per_student + 1) / elapsed:,.0f} rows/s", end="", flush=True)
+    print()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run queries.sql statement by statement or load synthetic data.")
+    parser.add_argument("--db", default=DB_PATH, help="SQLite database file")
+    parser.add_argument("--sql", default=SQL_PATH, help="SQL script to run")
+    commands = parser.add_subparsers(dest="command")
+
+    run_parser = commands.add_parser("run", help="run the script statement by statement (default)")
+    run_parser.add_argument("--select-only", action="store_true", help="skip CREATE/INSERT statements")
+    run_parser.add_argument("--show", type=int, default=5, help="result rows to print per query")
+    run_parser.add_argument("--no-explain", action="store_true", help="do not print query plans")
 
-# connecting to database
-conn = sqlite3.connect("school.db")
-cursor = conn.cursor()
+    load_parser = commands.add_parser("load", help="append synthetic students and grades")
+    load_parser.add_argument("--students", type=int, default=100_000)
+    load_parser.add_argument("--grades-per-student", type=int, default=10)
+    load_parser.add_argument("--batch-size", type=int, default=10_000, help="students per transaction")
+    load_parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
 
-# reading SQL-script from file
-with open("queries.sql", "r", encoding="utf-8") as f:
-    sql_script = f.read()
+    # connecting to database
+    conn = sqlite3.connect(args.db)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA cache_size=-65536")
+    try:
+        if args.command == "load":
+            ensure_schema(conn, args.sql)
+            load(conn, args.students, args.grades_per_student, args.batch_size, args.seed)
+        else:
+            run(conn, args.sql, getattr(args, "select_only", False), getattr(args, "show", 5),
+                not getattr(args, "no_explain", False))
+    finally:
+        conn.close()
 
-# execute all queries from file
-cursor.executescript(sql_script)
 
-# save changes
-conn.commit()
-conn.close()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Size and time the autocomplete prefix index against the FTS search it replaces for the search box.
+
+Seeds a throw-away database with `--rows` books, builds the index from it the way the app does at
+start-up, and reports:
+
+- build time and memory (the index's own estimate and what tracemalloc measured), per book and
+  extrapolated to `--target` rows, so the index can be sized for a large catalog;
+- lookup latency for short prefixes, next to the `/books/search/` statement for the same prefix;
+- the cost of the updates the write handlers make.
+
+Run from `lecture_6`:  python -m benchmarks.autocomplete --rows 200000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault("BOOKS_DB_PATH", os.path.join(tempfile.mkdtemp(), "books.db"))
+
+from sqlalchemy import insert  # noqa: E402
+
+from book_api.books.autocomplete import AutocompleteField, BookAutocomplete  # noqa: E402
+from book_api.books.database import engine  # noqa: E402
+from book_api.books.lifecycle import init_schema  # noqa: E402
+from book_api.books.models import Book  # noqa: E402
+from book_api.books.search_index import build_search_statement  # noqa: E402
+
+WORDS = ["the", "art", "of", "programming", "history", "python", "data", "systems", "theory", "practical",
+         "introduction", "advanced", "guide", "modern", "design", "patterns", "learning", "deep", "notes", "world"]
+PREFIXES = ["t", "th", "the", "pro", "py", "data s", "intro", "mod", "zz"]
+
+
+def seed(rows: int, seed_value: int) -> None:
+    """Fill the database with books whose titles are random word sequences plus a volume number."""
+    rng = random.Random(seed_value)
+    init_schema()
+    with engine.begin() as connection:
+        for start in range(0, rows, 50_000):
+            connection.execute(insert(Book), [
+                {"title": f"{' '.join(rng.choices(WORDS, k=rng.randint(2, 5))).capitalize()} {i}",
+                 "author": f"Author {rng.randrange(rows // 20 + 1)}", "year": rng.randint(1900, 2025)}
+                for i in range(start, min(start + 50_000, rows))
+            ])
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    return sorted(samples)[int(fraction * (len(samples) - 1))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000, help="books to seed")
+    parser.add_argument("--target", type=int, default=10_000_000, help="catalog size to extrapolate memory to")
+    parser.add_argument("--lookups", type=int, default=2000, help="lookups per prefix")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    seed(args.rows, args.seed)
+    start = time.perf_counter()
+    with engine.connect() as connection:
+        BookAutocomplete().build(connection)
+    build_seconds = time.perf_counter() - start
+    # Build again under tracemalloc, which slows allocation down too much to time the first one.
+    index = BookAutocomplete()
+    tracemalloc.start()
+    with engine.connect() as connection:
+        index.build(connection)
+    traced, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    stats = index.stats()
+    entries = sum(part["entries"] for part in stats.values())
+    estimate = sum(part["memory_bytes"] for part in stats.values())
+    print(f"build        {build_seconds:8.2f} s for {args.rows} books ({entries} distinct titles and authors)")
+    print(f"memory       {estimate / 2**20:8.1f} MiB estimated, {traced / 2**20:.1f} MiB traced, "
+          f"{traced / args.rows:.0f} B per book")
+    print(f"  at {args.target:,} books: ~{traced / args.rows * args.target / 2**30:.1f} GiB")
+
+    print("lookup (limit 10)        index p50/p99 us       search statement ms")
+    with engine.connect() as connection:
+        for prefix in PREFIXES:
+            samples = []
+            for _ in range(args.lookups):
+                begin = time.perf_counter()
+                index.suggest(prefix, AutocompleteField.all, 10)
+                samples.append((time.perf_counter() - begin) * 1e6)
+            begin = time.perf_counter()
+            connection.execute(build_search_statement(prefix, None, None).limit(10)).all()
+            sql_ms = (time.perf_counter() - begin) * 1000
+            print(f"  {prefix!r:<10} {percentile(samples, 0.5):14.1f} / {percentile(samples, 0.99):6.1f}"
+                  f" {sql_ms:24.2f}")
+
+    rng = random.Random(args.seed)
+    changes = [(None, {"title": f"New title {rng.random()}", "author": f"New author {i}"}) for i in range(20_000)]
+    begin = time.perf_counter()
+    for change in changes:
+        index.apply([change])
+    insert_us = (time.perf_counter() - begin) / len(changes) * 1e6
+    begin = time.perf_counter()
+    for old, new in changes:
+        index.apply([(new, None)])
+    delete_us = (time.perf_counter() - begin) / len(changes) * 1e6
+    print(f"updates      {insert_us:8.1f} us per added book, {delete_us:.1f} us per deleted book (incl. merges)")
+
+
+if __name__ == "__main__":
+    main()
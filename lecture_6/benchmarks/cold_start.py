@@ -0,0 +1,75 @@
+"""
+Measure cold-start time: from launching the server process to its first successful response.
+
+Each run starts `python -m book_api serve` in a fresh process, polls GET /books/?limit=1 until it
+answers 200 and then stops the server. With --fresh every run also starts from an empty database,
+which includes schema creation; otherwise the existing database is reused.
+
+Run from `lecture_6`:  python -m benchmarks.cold_start --runs 5 --workers 2
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_once(workers: int, db_path: str, timeout: float) -> float:
+    """Start a server, wait for the first 200 and return the elapsed seconds."""
+    port = _free_port()
+    env = {**os.environ, "BOOKS_DB_PATH": db_path}
+    command = [sys.executable, "-m", "book_api", "serve", "--port", str(port), "--workers", str(workers)]
+    start = time.perf_counter()
+    process = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=1) as client:
+            while time.perf_counter() - start < timeout:
+                try:
+                    if client.get("/books/", params={"limit": 1}).status_code == 200:
+                        return time.perf_counter() - start
+                except httpx.TransportError:
+                    pass
+                time.sleep(0.005)
+        raise TimeoutError(f"server did not answer within {timeout}s")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--db", help="database to start against (defaults to a temporary one)")
+    parser.add_argument("--fresh", action="store_true", help="use a new empty database for every run")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    if args.fresh and args.db:
+        parser.error("--fresh and --db are mutually exclusive")
+
+    shared_db = args.db or os.path.join(tempfile.mkdtemp(), "books.db")
+    timings = []
+    for run in range(args.runs):
+        db_path = os.path.join(tempfile.mkdtemp(), "books.db") if args.fresh else shared_db
+        elapsed = measure_once(args.workers, db_path, args.timeout)
+        timings.append(elapsed)
+        print(f"run {run + 1}: {elapsed * 1000:.0f} ms")
+
+    print(f"min {min(timings) * 1000:.0f} ms, median {statistics.median(timings) * 1000:.0f} ms, "
+          f"max {max(timings) * 1000:.0f} ms ({args.workers} worker(s))")
+
+
+if __name__ == "__main__":
+    main()
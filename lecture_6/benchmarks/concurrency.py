@@ -0,0 +1,87 @@
+"""
+Show that concurrent requests overlap inside the database instead of queuing on the event loop.
+
+Seeds a throw-away database, fires concurrent search requests at the app in-process and records
+when each SQL statement starts and finishes. With blocking database calls the statements run
+strictly one after another; with the async path several are in flight at the same time.
+
+Run from `lecture_6`:  python -m benchmarks.concurrency
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+os.environ.setdefault("BOOKS_DB_PATH", os.path.join(tempfile.mkdtemp(), "books.db"))
+
+import httpx  # noqa: E402
+from sqlalchemy import event, insert  # noqa: E402
+
+from book_api.books.database import read_engine, engine  # noqa: E402
+from book_api.books.lifecycle import init_schema  # noqa: E402
+from book_api.books.models import Book  # noqa: E402
+from book_api.main import app  # noqa: E402
+
+
+def seed(rows: int) -> None:
+    """Fill the database with `rows` books whose titles share common prefixes."""
+    init_schema()
+    with engine.begin() as connection:
+        connection.execute(
+            insert(Book),
+            [{"title": f"Programming volume {i}", "author": f"Author {i % 997}", "year": 1900 + i % 120}
+             for i in range(rows)],
+        )
+
+
+def max_overlap(intervals: list[tuple[float, float]]) -> int:
+    """Return the largest number of intervals that were open at the same moment."""
+    edges = sorted([(start, 1) for start, _ in intervals] + [(end, -1) for _, end in intervals])
+    current = peak = 0
+    for _, step in edges:
+        current += step
+        peak = max(peak, current)
+    return peak
+
+
+async def run(requests: int, query: str) -> None:
+    started: dict[int, float] = {}
+    intervals: list[tuple[float, float]] = []
+
+    @event.listens_for(read_engine.sync_engine, "before_cursor_execute")
+    def before(conn, cursor, statement, parameters, context, executemany):
+        started[id(context)] = time.perf_counter()
+
+    @event.listens_for(read_engine.sync_engine, "after_cursor_execute")
+    def after(conn, cursor, statement, parameters, context, executemany):
+        intervals.append((started.pop(id(context)), time.perf_counter()))
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app), httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        begin = time.perf_counter()
+        responses = await asyncio.gather(
+            *(client.get("/books/search/", params={"book_title": query}) for _ in range(requests))
+        )
+        wall = time.perf_counter() - begin
+
+    statement_time = sum(end - start for start, end in intervals)
+    print(f"requests:              {requests} (status {sorted({r.status_code for r in responses})})")
+    print(f"wall time:             {wall * 1000:.1f} ms")
+    print(f"sum of SQL time:       {statement_time * 1000:.1f} ms")
+    print(f"max statements in flight at once: {max_overlap(intervals)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20_000, help="books to seed")
+    parser.add_argument("--requests", type=int, default=10, help="concurrent search requests")
+    parser.add_argument("--query", default="prog", help="title term to search for")
+    args = parser.parse_args()
+
+    seed(args.rows)
+    asyncio.run(run(args.requests, args.query))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Run benchmark scenarios against the book API and report throughput and latency percentiles.
+
+By default the app runs in-process (httpx ASGI transport, no network); pass --url to target a
+running server such as `uvicorn book_api.main:app`. Results can be saved as a baseline and later
+runs compared against it; a regression beyond --tolerance makes the command exit with status 1.
+
+Run from `lecture_6`:
+    python -m benchmarks.seed --rows 100000 --db /tmp/bench.db --reset
+    python -m benchmarks.run --db /tmp/bench.db --requests 2000 --concurrency 16
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from typing import Dict, List
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def run_scenario(client, scenario, ctx, requests: int, concurrency: int) -> Dict[str, float]:
+    """Issue `requests` calls of `scenario` from `concurrency` workers and summarise latencies."""
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    remaining = iter(range(requests))
+
+    async def worker() -> None:
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await scenario(client, ctx)
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "throughput_rps": requests / elapsed,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "errors": sum(count for status, count in statuses.items() if status >= 500),
+        "statuses": dict(sorted(statuses.items())),
+    }
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float) -> List[str]:
+    """Return a message for every scenario that got slower than the baseline by more than `tolerance`."""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        if current["throughput_rps"] < previous["throughput_rps"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {current['throughput_rps']:.0f} < baseline {previous['throughput_rps']:.0f} rps"
+            )
+        if current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {current['p95_ms']:.2f} > baseline {previous['p95_ms']:.2f} ms")
+    return regressions
+
+
+def print_report(results: Dict[str, Dict], baseline: Dict[str, Dict]) -> None:
+    print(f"{'scenario':<16}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'vs base':>10}  statuses")
+    for name, row in results.items():
+        previous = baseline.get(name)
+        delta = f"{row['throughput_rps'] / previous['throughput_rps'] - 1:+.0%}" if previous else "-"
+        print(
+            f"{name:<16}{row['throughput_rps']:>10.0f}{row['p50_ms']:>10.2f}{row['p95_ms']:>10.2f}"
+            f"{row['p99_ms']:>10.2f}{delta:>10}  {row['statuses']}"
+        )
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Dict]:
+    import httpx
+    from sqlalchemy import func, select
+
+    from book_api.books.database import engine
+    from book_api.books.models import Book
+
+    from .scenarios import SCENARIOS, Context
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=60)
+        lifespan = contextlib.nullcontext()
+    else:
+        from book_api.main import app
+
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60)
+        lifespan = app.router.lifespan_context(app)
+
+    results = {}
+    async with lifespan, client:
+        with engine.connect() as connection:
+            max_id = connection.execute(select(func.max(Book.id))).scalar() or 0
+        for name in args.scenarios:
+            ctx = Context(rng=random.Random(args.seed), max_id=max_id)
+            if args.warmup:
+                await run_scenario(client, SCENARIOS[name], ctx, args.warmup, args.concurrency)
+            results[name] = await run_scenario(client, SCENARIOS[name], ctx, args.requests, args.concurrency)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", help="database file (defaults to BOOKS_DB_PATH or the app's books.db)")
+    parser.add_argument("--url", help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--scenarios", nargs="+", default=None, help="scenarios to run (default: all)")
+    parser.add_argument("--requests", type=int, default=1000, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent clients")
+    parser.add_argument("--warmup", type=int, default=50, help="untimed requests before each scenario")
+    parser.add_argument("--seed", type=int, default=7, help="random seed for request parameters")
+    parser.add_argument("--no-cache", action="store_true", help="disable the in-process response cache")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline file to compare with")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown before failing (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    if args.db:
+        os.environ["BOOKS_DB_PATH"] = os.path.abspath(args.db)
+    if args.no_cache:
+        os.environ["BOOKS_CACHE_MAX_ENTRIES"] = "0"
+
+    from .scenarios import SCENARIOS
+
+    args.scenarios = args.scenarios or list(SCENARIOS)
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}; choose from {', '.join(SCENARIOS)}")
+
+    results = asyncio.run(run(args))
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["scenarios"]
+    print_report(results, baseline)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"requests": args.requests, "concurrency": args.concurrency, "scenarios": results}, f, indent=2)
+            f.write("\n")
+        print(f"baseline saved to {args.baseline}")
+        return
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print("\nREGRESSIONS:\n  " + "\n  ".join(regressions))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
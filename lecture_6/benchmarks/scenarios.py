@@ -0,0 +1,90 @@
+"""Request scenarios for the benchmark runner; each one issues a single HTTP request."""
+import random
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict
+
+import httpx
+
+from book_api.books.pagination import encode_cursor
+
+from .seed import FIRST_NAMES, LAST_NAMES, TITLE_WORDS
+
+
+@dataclass
+class Context:
+    """Shared state for a run: the random generator and the id range of the seeded table."""
+    rng: random.Random
+    max_id: int
+
+
+Scenario = Callable[[httpx.AsyncClient, Context], Awaitable[httpx.Response]]
+
+
+def _random_id(ctx: Context) -> int:
+    return ctx.rng.randint(1, max(ctx.max_id, 1))
+
+
+async def list_books(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    return await client.get("/books/", params={"limit": 100, "after": encode_cursor(_random_id(ctx))})
+
+
+async def search_title(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    words = ctx.rng.sample(TITLE_WORDS, 2)
+    return await client.get("/books/search/", params={"book_title": " ".join(words)})
+
+
+async def search_author(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    return await client.get("/books/search/", params={"author": ctx.rng.choice(LAST_NAMES)})
+
+
+async def search_year(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    return await client.get("/books/search/", params={"year": ctx.rng.randint(1900, 2026)})
+
+
+async def search_combined(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    params = {
+        "book_title": ctx.rng.choice(TITLE_WORDS)[:4],
+        "author": ctx.rng.choice(FIRST_NAMES),
+        "year": ctx.rng.randint(1980, 2026),
+    }
+    return await client.get("/books/search/", params=params)
+
+
+async def create(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    book = {
+        "title": " ".join(ctx.rng.sample(TITLE_WORDS, 3)),
+        "author": f"{ctx.rng.choice(FIRST_NAMES)} {ctx.rng.choice(LAST_NAMES)}",
+        "year": ctx.rng.randint(1500, 2026),
+    }
+    return await client.post("/books/", json=book)
+
+
+async def update(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    return await client.put(f"/books/{_random_id(ctx)}", json={"year": ctx.rng.randint(1500, 2026)})
+
+
+async def delete(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    return await client.delete(f"/books/{_random_id(ctx)}")
+
+
+_READS = [list_books, search_title, search_author, search_year, search_combined]
+_WRITES = [create, update, delete]
+
+
+async def mixed(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    """Roughly 90% reads and 10% writes."""
+    pool = _WRITES if ctx.rng.random() < 0.1 else _READS
+    return await ctx.rng.choice(pool)(client, ctx)
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "list": list_books,
+    "search_title": search_title,
+    "search_author": search_author,
+    "search_year": search_year,
+    "search_combined": search_combined,
+    "create": create,
+    "update": update,
+    "delete": delete,
+    "mixed": mixed,
+}
@@ -0,0 +1,144 @@
+"""
+Compare write throughput of three ways of writing single books.
+
+- legacy: load the row, modify it, commit and refresh it (two or three round-trips per write).
+- returning: one INSERT/UPDATE/DELETE ... RETURNING and one commit per write.
+- queued: the handlers in `book_api.books.crud`, which send the RETURNING statement through the
+  group-commit write queue, so concurrent writes share a transaction and an fsync.
+
+All are driven directly, without HTTP, on a throw-away database. `--concurrency` runs that many
+writers at once, which is where the write queue pays off.
+
+Run from `lecture_6`:  python -m benchmarks.writes --ops 2000 --concurrency 32
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from functools import partial
+
+os.environ.setdefault("BOOKS_DB_PATH", os.path.join(tempfile.mkdtemp(), "books.db"))
+
+from sqlalchemy import delete, insert, update  # noqa: E402
+
+from book_api.books.crud import add_a_new_book, delete_a_book_by_id, update_book_details  # noqa: E402
+from book_api.books.database import AsyncSessionLocal  # noqa: E402
+from book_api.books.lifecycle import init_schema  # noqa: E402
+from book_api.books.models import BOOK_COLUMNS, Book  # noqa: E402
+from book_api.books.repository import current_repository  # noqa: E402
+from book_api.books.schemas import BookCreate, BookUpdate  # noqa: E402
+from book_api.books.write_queue import write_queue  # noqa: E402
+
+
+async def legacy_create(book: BookCreate, db) -> Book:
+    db_book = Book(title=book.title, author=book.author, year=book.year)
+    db.add(db_book)
+    await db.commit()
+    await db.refresh(db_book)
+    return db_book
+
+
+async def legacy_update(book_id: int, book_update: BookUpdate, db) -> Book:
+    book = await db.get(Book, book_id)
+    book.title = book_update.title
+    await db.commit()
+    await db.refresh(book)
+    return book
+
+
+async def legacy_delete(book_id: int, db) -> Book:
+    book = await db.get(Book, book_id)
+    await db.delete(book)
+    await db.commit()
+    return book
+
+
+async def returning_create(book: BookCreate, db) -> dict:
+    result = await db.execute(insert(Book).values(**book.model_dump()).returning(*BOOK_COLUMNS))
+    row = result.one()
+    await db.commit()
+    return row._asdict()
+
+
+async def returning_update(book_id: int, book_update: BookUpdate, db) -> dict:
+    stmt = update(Book).where(Book.id == book_id).values(**book_update.model_dump(exclude_none=True))
+    row = (await db.execute(stmt.returning(*BOOK_COLUMNS).execution_options(synchronize_session=False))).one()
+    await db.commit()
+    return row._asdict()
+
+
+async def returning_delete(book_id: int, db) -> dict:
+    stmt = delete(Book).where(Book.id == book_id).returning(*BOOK_COLUMNS)
+    row = (await db.execute(stmt.execution_options(synchronize_session=False))).one()
+    await db.commit()
+    return row._asdict()
+
+
+def with_session(call):
+    """Give a direct variant a fresh session per write, like a request dependency would."""
+    async def wrapper(*args):
+        async with AsyncSessionLocal() as db:
+            return await call(*args, db)
+    return wrapper
+
+
+async def timed(label: str, ops: int, concurrency: int, call) -> float:
+    """Run `call(i)` for i in range(ops) with `concurrency` writers and print ops/s."""
+    counter = iter(range(ops))
+
+    async def writer() -> None:
+        for i in counter:
+            await call(i)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(writer() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<10} {ops / elapsed:10.0f} ops/s")
+    return ops / elapsed
+
+
+async def run(ops: int, concurrency: int) -> None:
+    new = BookCreate(title="Benchmark", author="Writer", year=2000)
+    change = BookUpdate(title="Benchmark, revised")
+
+    books = current_repository()
+    await write_queue.start()
+    results = {}
+    for variant, create, modify, remove in (
+        ("legacy", with_session(legacy_create), with_session(legacy_update), with_session(legacy_delete)),
+        ("returning", with_session(returning_create), with_session(returning_update), with_session(returning_delete)),
+        ("queued", partial(add_a_new_book, books=books), partial(update_book_details, books=books),
+         partial(delete_a_book_by_id, books=books)),
+    ):
+        print(variant)
+        ids = []
+
+        async def do_create(i):
+            book = await create(new)
+            ids.append(book["id"] if isinstance(book, dict) else book.id)
+
+        results[variant, "create"] = await timed("create", ops, concurrency, do_create)
+        ids.sort()
+        results[variant, "update"] = await timed("update", ops, concurrency, lambda i: modify(ids[i], change))
+        results[variant, "delete"] = await timed("delete", ops, concurrency, lambda i: remove(ids[i]))
+    await write_queue.stop()
+
+    print("speed-up over legacy")
+    for operation in ("create", "update", "delete"):
+        legacy = results["legacy", operation]
+        print(f"  {operation:<10} returning {results['returning', operation] / legacy:6.2f}x"
+              f"   queued {results['queued', operation] / legacy:6.2f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ops", type=int, default=2000, help="writes per operation and variant")
+    parser.add_argument("--concurrency", type=int, default=1, help="concurrent writers")
+    args = parser.parse_args()
+    init_schema()
+    asyncio.run(run(args.ops, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
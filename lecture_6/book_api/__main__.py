@@ -0,0 +1,163 @@
+import argparse
+import asyncio
+import os
+import sys
+
+import uvicorn
+
+
+def serve(args: argparse.Namespace) -> None:
+    """Run the API under uvicorn; with --workers > 1 each process shares the same SQLite file."""
+    if args.workers > 1 and os.getenv("BOOKS_STORAGE") == "memory":
+        sys.exit("BOOKS_STORAGE=memory keeps a copy of the catalog per process; run a single worker")
+    os.environ["WEB_CONCURRENCY"] = str(args.workers)  # the workers check their storage against it
+    uvicorn.run(
+        "book_api.main:create_app",
+        factory=True,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+    )
+
+
+def rebuild_stats(args: argparse.Namespace) -> None:
+    """Recompute the per-author and per-year aggregate tables from the books table."""
+    from .books.database import engine
+    from .books.lifecycle import init_schema
+    from .books.stats import rebuild_stats as rebuild
+
+    init_schema()
+    with engine.begin() as connection:
+        rebuild(connection)
+    print("Catalog statistics rebuilt.")
+
+
+def convert_auto_vacuum(args: argparse.Namespace) -> None:
+    """Apply the configured auto_vacuum mode to an existing catalog; run it while the API is stopped."""
+    from .books.database import profile
+    from .books.lifecycle import convert_auto_vacuum as convert
+    from .books.lifecycle import init_schema
+
+    converted = convert()
+    init_schema()
+    if converted:
+        print(f"Database rewritten with auto_vacuum={profile.auto_vacuum.upper()}.")
+    else:
+        print(f"Database already uses auto_vacuum={profile.auto_vacuum.upper()}.")
+
+
+def export(args: argparse.Namespace) -> None:
+    """Stream the catalog to a file (or stdout) in constant memory."""
+    from .books.export import ExportCompression, ExportFormat, ExportUnavailable, iter_export, open_export
+    from .books.lifecycle import dispose_engines, init_schema
+
+    try:
+        encoder, compressor = open_export(ExportFormat(args.format), ExportCompression(args.compression))
+    except (ExportUnavailable, ValueError) as exc:
+        sys.exit(str(exc))
+
+    async def run(output) -> None:
+        try:
+            async for data in iter_export(encoder, compressor, args.chunk_size):
+                output.write(data)
+        finally:
+            await dispose_engines()
+
+    init_schema()
+    if args.output == "-":
+        asyncio.run(run(sys.stdout.buffer))
+    else:
+        with open(args.output, "wb") as output:
+            asyncio.run(run(output))
+
+
+# Filter combinations the UI sends; none of them should need a full table scan.
+COMMON_SEARCHES = [
+    {"title": "shadow"},
+    {"author": "tolstoy"},
+    {"title": "river", "author": "anna"},
+    {"year": 1999},
+    {"year_from": 1990, "year_to": 1999},
+    {"year_from": 1990, "year_to": 1999, "sort": "title"},
+    {"year": 1999, "sort": "title"},
+    {"year_from": 2000, "sort": "-year"},
+    {"title": "garden", "year": 2001},
+    {"author": "murakami", "year_from": 1980, "year_to": 2010, "sort": "year"},
+]
+
+
+def explain(args: argparse.Namespace) -> None:
+    """Print EXPLAIN QUERY PLAN for one search, or for every common search with --common."""
+    from .books.database import engine
+    from .books.lifecycle import init_schema
+    from .books.search_index import SearchSort, build_search_statement, explain_statement
+
+    if args.common:
+        searches = COMMON_SEARCHES
+    else:
+        searches = [{"title": args.title, "author": args.author, "year": args.year,
+                     "year_from": args.year_from, "year_to": args.year_to, "sort": args.sort}]
+
+    init_schema()
+    full_scans = 0
+    with engine.connect() as connection:
+        for search in searches:
+            stmt = build_search_statement(
+                search.get("title"), search.get("author"), search.get("year"),
+                search.get("year_from"), search.get("year_to"), SearchSort(search.get("sort", "relevance")),
+            )
+            report = explain_statement(connection, stmt.limit(args.limit))
+            full_scans += report["full_scan"]
+            filters = ", ".join(f"{key}={value}" for key, value in search.items() if value is not None)
+            print(f"{'FULL SCAN' if report['full_scan'] else 'ok':<10}{filters or '(no filters)'}")
+            for step in report["plan"]:
+                print(f"          {step}")
+    if full_scans:
+        sys.exit(f"{full_scans} search(es) scan a whole table or index")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m book_api", description="Book API command line.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser("serve", help="run the HTTP server")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8000)
+    serve_parser.add_argument(
+        "--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "1")), help="number of worker processes"
+    )
+    serve_parser.set_defaults(handler=serve)
+
+    rebuild_parser = commands.add_parser("rebuild-stats", help="recompute the catalog statistics tables")
+    rebuild_parser.set_defaults(handler=rebuild_stats)
+
+    convert_parser = commands.add_parser(
+        "convert-auto-vacuum", help="rewrite the database file to apply the configured auto_vacuum mode"
+    )
+    convert_parser.set_defaults(handler=convert_auto_vacuum)
+
+    export_parser = commands.add_parser("export", help="export the catalog as CSV, NDJSON, Parquet or Arrow")
+    export_parser.add_argument("--format", choices=["csv", "ndjson", "parquet", "arrow"], default="ndjson")
+    export_parser.add_argument("--compression", choices=["none", "gzip", "zstd"], default="none")
+    export_parser.add_argument("--chunk-size", type=int, default=10_000, help="rows read per database round-trip")
+    export_parser.add_argument("-o", "--output", default="-", help="output file ('-' for stdout)")
+    export_parser.set_defaults(handler=export)
+
+    explain_parser = commands.add_parser("explain", help="show the query plan of a search")
+    explain_parser.add_argument("--title")
+    explain_parser.add_argument("--author")
+    explain_parser.add_argument("--year", type=int)
+    explain_parser.add_argument("--year-from", type=int)
+    explain_parser.add_argument("--year-to", type=int)
+    explain_parser.add_argument("--sort", default="relevance",
+                                choices=["relevance", "title", "-title", "year", "-year", "author"])
+    explain_parser.add_argument("--limit", type=int, help="apply LIMIT like the ?limit= parameter")
+    explain_parser.add_argument("--common", action="store_true", help="check every common search combination")
+    explain_parser.set_defaults(handler=explain)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
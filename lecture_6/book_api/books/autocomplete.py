@@ -0,0 +1,227 @@
+import os
+import unicodedata
+from bisect import bisect_left, insort
+from enum import Enum
+from heapq import merge
+from itertools import islice
+from sys import getsizeof
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.engine import Connection
+
+from .metrics import AUTOCOMPLETE_ENTRIES, AUTOCOMPLETE_MEMORY
+from .models import AuthorStats, Book
+
+# Keys added since the last merge are kept in a small sorted list; past this size it is merged in.
+MERGE_THRESHOLD = 4096
+BUILD_CHUNK_SIZE = 50_000
+
+Change = Tuple[Optional[Mapping[str, object]], Optional[Mapping[str, object]]]
+
+
+class AutocompleteField(str, Enum):
+    all = "all"
+    title = "title"
+    author = "author"
+
+
+def normalize(text: str) -> str:
+    """Case- and accent-insensitive form of `text` with single spaces, as the prefix index stores it.
+
+    A trailing space is kept, so "the " only matches titles with a word "the".
+    """
+    if not text.isascii():
+        text = "".join(ch for ch in unicodedata.normalize("NFKD", text) if not unicodedata.combining(ch))
+    key = " ".join(text.casefold().split())
+    return key + " " if key and text[-1].isspace() else key
+
+
+class PrefixIndex:
+    """Distinct strings with their book counts in a sorted array searched with bisect.
+
+    The bulk of the keys lives in one sorted list built at start-up. New keys go into a small sorted
+    list that is merged into the big one (a two-run timsort) every MERGE_THRESHOLD insertions, so a
+    write never moves millions of pointers. Keys whose last book is removed become tombstones that
+    lookups skip; they are dropped once they make up a quarter of the array.
+    """
+
+    def __init__(self, merge_threshold: int = MERGE_THRESHOLD) -> None:
+        self.merge_threshold = merge_threshold
+        self._keys: List[str] = []
+        self._recent: List[str] = []
+        self._dead: Set[str] = set()
+        self._display: Dict[str, str] = {}
+        self._counts: Dict[str, int] = {}
+        # Bytes of the string objects, tracked as they come and go so memory_bytes() is O(1).
+        self._key_bytes = 0
+        self._display_bytes = 0
+
+    def load(self, items: Iterable[Tuple[str, int]]) -> None:
+        """Replace the contents with `(text, book count)` pairs; texts that normalize alike are merged."""
+        display: Dict[str, str] = {}
+        counts: Dict[str, int] = {}
+        for text, count in items:
+            key = normalize(text)
+            if not key:
+                continue
+            if key in counts:
+                counts[key] += count
+            else:
+                counts[key] = count
+                display[key] = key if text == key else text
+        self._keys = sorted(counts)
+        self._recent, self._dead = [], set()
+        self._display, self._counts = display, counts
+        self._key_bytes = sum(map(getsizeof, self._keys))
+        self._display_bytes = sum(getsizeof(text) for key, text in display.items() if text != key)
+
+    def add(self, text: str) -> None:
+        """Count one more book with this title or author."""
+        key = normalize(text)
+        if not key:
+            return
+        count = self._counts.get(key)
+        if count is not None:
+            self._counts[key] = count + 1
+            return
+        self._counts[key] = 1
+        self._display[key] = key if text == key else text
+        if text != key:
+            self._display_bytes += getsizeof(text)
+        if key in self._dead:
+            self._dead.discard(key)  # still in the arrays
+            return
+        insort(self._recent, key)
+        self._key_bytes += getsizeof(key)
+        if len(self._recent) >= self.merge_threshold:
+            self._merge()
+
+    def remove(self, text: str) -> None:
+        """Count one book less; the key disappears from suggestions when no book uses it."""
+        key = normalize(text)
+        count = self._counts.get(key)
+        if count is None:
+            return
+        if count > 1:
+            self._counts[key] = count - 1
+            return
+        del self._counts[key]
+        display = self._display.pop(key)
+        if display != key:
+            self._display_bytes -= getsizeof(display)
+        self._dead.add(key)
+        if len(self._dead) > len(self._keys) // 4 + self.merge_threshold:
+            self._compact()
+
+    def _merge(self) -> None:
+        self._keys += self._recent
+        self._keys.sort()
+        self._recent = []
+
+    def _compact(self) -> None:
+        self._merge()
+        dead = self._dead
+        self._keys = [key for key in self._keys if key not in dead]
+        self._key_bytes -= sum(map(getsizeof, dead))
+        self._dead = set()
+
+    def _scan(self, keys: Sequence[str], prefix: str) -> Iterator[str]:
+        dead = self._dead
+        for i in range(bisect_left(keys, prefix), len(keys)):
+            key = keys[i]
+            if not key.startswith(prefix):
+                return
+            if key not in dead:
+                yield key
+
+    def search(self, prefix: str, limit: int) -> List[Tuple[str, str, int]]:
+        """The first `limit` `(key, text, book count)` entries starting with `prefix`, in key order."""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        keys = merge(self._scan(self._keys, prefix), self._scan(self._recent, prefix))
+        return [(key, self._display[key], self._counts[key]) for key in islice(keys, limit)]
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def memory_bytes(self) -> int:
+        """Approximate size of the index: the containers plus the strings they own."""
+        containers = (self._keys, self._recent, self._dead, self._display, self._counts)
+        return sum(map(getsizeof, containers)) + self._key_bytes + self._display_bytes
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._counts),
+            "keys": len(self._keys) + len(self._recent),
+            "pending_merge": len(self._recent),
+            "tombstones": len(self._dead),
+            "memory_bytes": self.memory_bytes(),
+        }
+
+
+class BookAutocomplete:
+    """Prefix indexes over book titles and authors, built at start-up and updated by the write handlers.
+
+    Lookups never touch SQLite. The index is per process: with several workers, a worker only sees
+    the writes it served itself until it restarts.
+    """
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self.titles = PrefixIndex()
+        self.authors = PrefixIndex()
+
+    def build(self, connection: Connection) -> None:
+        """Load the distinct titles (grouped over the title index) and authors (from the aggregate table)."""
+        if not self.enabled:
+            return
+        titles = connection.execution_options(yield_per=BUILD_CHUNK_SIZE).execute(
+            select(Book.title, func.count()).group_by(Book.title)
+        )
+        self.titles.load(titles.tuples())
+        authors = connection.execution_options(yield_per=BUILD_CHUNK_SIZE).execute(
+            select(AuthorStats.author, AuthorStats.book_count)
+        )
+        self.authors.load(authors.tuples())
+        self._update_metrics()
+
+    def apply(self, changes: Iterable[Change]) -> None:
+        """Apply committed writes given as `(old row, new row)` pairs; None stands for no row."""
+        if not self.enabled:
+            return
+        for old, new in changes:
+            for field, index in (("title", self.titles), ("author", self.authors)):
+                before = old[field] if old else None
+                after = new[field] if new else None
+                if before == after:
+                    continue
+                if before is not None:
+                    index.remove(before)
+                if after is not None:
+                    index.add(after)
+        self._update_metrics()
+
+    def suggest(self, prefix: str, field: AutocompleteField, limit: int) -> List[Dict[str, object]]:
+        """Up to `limit` suggestions for `prefix` in alphabetical order of their normalized form."""
+        indexes = []
+        if field is not AutocompleteField.author:
+            indexes.append(("title", self.titles))
+        if field is not AutocompleteField.title:
+            indexes.append(("author", self.authors))
+        found = merge(*(
+            [(key, name, text, count) for key, text, count in index.search(prefix, limit)] for name, index in indexes
+        ))
+        return [{"value": text, "field": name, "books": count} for _, name, text, count in islice(found, limit)]
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {"title": self.titles.stats(), "author": self.authors.stats()}
+
+    def _update_metrics(self) -> None:
+        for name, index in (("title", self.titles), ("author", self.authors)):
+            AUTOCOMPLETE_ENTRIES.set(len(index), field=name)
+            AUTOCOMPLETE_MEMORY.set(index.memory_bytes(), field=name)
+
+
+autocomplete = BookAutocomplete(enabled=os.getenv("BOOKS_AUTOCOMPLETE", "1") != "0")
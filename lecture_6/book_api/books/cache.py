@@ -0,0 +1,118 @@
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Hashable, Iterable, NamedTuple, Optional
+
+from fastapi import Request, Response
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+
+CACHEABLE_STATUSES = frozenset({200, 404})
+# Response headers worth replaying from the cache; everything else is regenerated.
+_KEPT_HEADERS = ("content-type", "x-next-cursor")
+
+
+class CachedResponse(NamedTuple):
+    expires_at: float
+    status_code: int
+    body: bytes
+    headers: Dict[str, str]
+
+
+class ResponseCache:
+    """Bounded in-process cache of rendered responses with LRU and TTL eviction.
+
+    `version` is the catalog version: every write bumps it and drops all entries. It is also
+    exposed in the ETag, so conditional requests can be answered without touching the database.
+    The counter is per process and does not see writes handled by other workers, so the ETag also
+    names the current TTL window: entries and ETags alike stop being served after `ttl_seconds`,
+    which bounds how stale a response from another worker may be.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 30.0) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        # Distinguishes this process (and restarts) so ETags from different workers never collide.
+        self._instance = uuid.uuid4().hex[:12]
+
+    def etag(self, version: Optional[int] = None) -> str:
+        """ETag for the given catalog version, the current one by default, valid until the TTL window ends."""
+        # With no TTL every tag is unique, so conditional requests are never answered from here.
+        window = int(time.monotonic() // self.ttl_seconds) if self.ttl_seconds > 0 else time.monotonic_ns()
+        return f'"{self._instance}-{self.version if version is None else version}-{window}"'
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        """Return a fresh entry for `key`, or None if it is missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: Hashable, status_code: int, body: bytes, headers: Dict[str, str], version: int) -> None:
+        """Store a response rendered at catalog `version`; ignored if a write happened in the meantime."""
+        if version != self.version:
+            return
+        self._entries[key] = CachedResponse(time.monotonic() + self.ttl_seconds, status_code, body, headers)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self) -> None:
+        """Bump the catalog version and drop every cached response."""
+        self.version += 1
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+response_cache = ResponseCache(
+    max_entries=int(os.getenv("BOOKS_CACHE_MAX_ENTRIES", "1024")),
+    ttl_seconds=float(os.getenv("BOOKS_CACHE_TTL_SECONDS", "30")),
+)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    return any(candidate.strip() in (etag, f"W/{etag}", "*") for candidate in if_none_match.split(","))
+
+
+class ResponseCacheMiddleware(BaseHTTPMiddleware):
+    """Serve GET requests for the given paths from `ResponseCache`, answering 304 for a current ETag."""
+
+    def __init__(self, app, cache: ResponseCache, paths: Iterable[str]) -> None:
+        super().__init__(app)
+        self.cache = cache
+        self.paths: FrozenSet[str] = frozenset(paths)
+
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        if request.method != "GET" or request.url.path not in self.paths:
+            return await call_next(request)
+
+        version = self.cache.version
+        etag = self.cache.etag(version)
+        validators = {"ETag": etag, "Cache-Control": "no-cache"}
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=validators)
+
+        key = (request.url.path, tuple(sorted(request.query_params.multi_items())))
+        entry = self.cache.get(key)
+        if entry is not None:
+            return Response(entry.body, entry.status_code, headers={**entry.headers, **validators, "X-Cache": "HIT"})
+
+        response = await call_next(request)
+        if response.status_code not in CACHEABLE_STATUSES:
+            return response
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        headers = {name: response.headers[name] for name in _KEPT_HEADERS if name in response.headers}
+        self.cache.put(key, response.status_code, body, headers, version)
+        return Response(body, response.status_code, headers={**headers, **validators, "X-Cache": "MISS"})
@@ -1,61 +1,96 @@
-from fastapi import APIRouter, Depends, HTTPException, Path
-from sqlalchemy.orm import Session
-from typing import List, Annotated
+from fastapi import APIRouter, Depends, HTTPException, Path, Query
+from fastapi.responses import StreamingResponse
+from typing import Awaitable, List, Annotated, Optional, TypeVar
 
-from .models import Book
-from .database import get_db
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+
+from .autocomplete import autocomplete
+from .pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    STREAM_CHUNK_SIZE,
+    decode_cursor,
+    encode_cursor,
+    iter_books_ndjson,
+)
+from .repository import BookRepository, current_repository, get_repository
+from .responses import FastJSONResponse, rows_to_dicts
 from .schemas import Book as BookResponse, BookCreate, BookUpdate
+from .write_queue import WriteQueueFull
 
 router = APIRouter(prefix="/books", tags=["books"])
 
+T = TypeVar("T")
+
+
+async def write_or_503(write: Awaitable[T]) -> T:
+    """Await a queued write; a full write queue or no free write connection is reported as 503 so clients back off."""
+    try:
+        return await write
+    except (WriteQueueFull, PoolTimeout):
+        raise HTTPException(status_code=503, detail="Too many pending writes", headers={"Retry-After": "1"})
+
 
 @router.post("/", response_model=BookResponse, status_code=201)
-async def add_a_new_book(book: BookCreate, db: Session = Depends(get_db)) -> BookResponse:
+async def add_a_new_book(book: BookCreate, books: BookRepository = Depends(current_repository)) -> BookResponse:
     """Add a new book to the collection."""
-    db_book = Book(title=book.title, author=book.author, year=book.year)
-    db.add(db_book)
-    db.commit()
-    db.refresh(db_book)
-    return db_book
+    created = await write_or_503(books.create(book.model_dump()))
+    autocomplete.apply([(None, created)])
+    return created
 
 
 @router.get("/", response_model=List[BookResponse])
-async def get_all_books(db: Session = Depends(get_db)) -> List[BookResponse]:
-    """Retrieve all books from the collection."""
-    return db.query(Book).all()
+async def get_all_books(
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of books to return"),
+        after: Optional[str] = Query(None, description="Opaque cursor taken from the X-Next-Cursor header"),
+        books: BookRepository = Depends(get_repository),
+) -> List[BookResponse]:
+    """Retrieve one page of books ordered by ID; the next page cursor is sent in X-Next-Cursor."""
+    try:
+        after_id = decode_cursor(after) if after else 0
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    rows = await books.page(after_id, limit + 1)
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Cursor"] = encode_cursor(rows[-1].id)
+    return FastJSONResponse(rows_to_dicts(rows), headers=headers)
+
+
+@router.get("/stream", response_class=StreamingResponse)
+async def stream_all_books(
+        chunk_size: int = Query(STREAM_CHUNK_SIZE, ge=1, le=10_000, description="Rows read per database round-trip"),
+        books: BookRepository = Depends(current_repository),
+) -> StreamingResponse:
+    """Stream the whole collection as NDJSON, one book per line."""
+    return StreamingResponse(iter_books_ndjson(books.iter_rows(chunk_size)), media_type="application/x-ndjson")
 
 
 @router.put("/{book_id}", response_model=BookResponse)
 async def update_book_details(
         book_id: Annotated[int, Path(..., ge=1)],
         book_update: BookUpdate,
-        db: Session = Depends(get_db),
+        books: BookRepository = Depends(current_repository),
 ) -> BookResponse:
     """Update details of a book by its ID."""
-    book = db.query(Book).filter(Book.id == book_id).first()
-    if not book:
+    result = await write_or_503(books.update(book_id, book_update.model_dump(exclude_none=True)))
+    if result is None:
         raise HTTPException(status_code=404, detail="Book not found")
-
-    if book_update.title is not None:
-        book.title = book_update.title
-    if book_update.author is not None:
-        book.author = book_update.author
-    if book_update.year is not None:
-        book.year = book_update.year
-
-    db.commit()
-    db.refresh(book)
-    return book
+    previous, updated = result
+    autocomplete.apply([(previous, updated)])
+    return updated
 
 
 @router.delete("/{book_id}", response_model=BookResponse, status_code=200)
-async def delete_a_book_by_id(book_id: Annotated[int, Path(..., ge=1)], db: Session = Depends(get_db)) -> BookResponse:
+async def delete_a_book_by_id(
+        book_id: Annotated[int, Path(..., ge=1)],
+        books: BookRepository = Depends(current_repository),
+) -> BookResponse:
     """Delete a book by its ID."""
-    book = db.query(Book).filter(Book.id == book_id).first()
-    if not book:
+    deleted = await write_or_503(books.delete(book_id))
+    if deleted is None:
         raise HTTPException(status_code=404, detail="Book not found")
-
-    db.delete(book)
-    db.commit()
-    return book
-
+    autocomplete.apply([(deleted, None)])
+    return deleted
@@ -1,27 +1,123 @@
-from typing import Generator
+from dataclasses import dataclass
+from typing import AsyncGenerator
 import os
-from sqlalchemy import create_engine
+import time
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.orm import sessionmaker
+
+from .metrics import instrument_engine, observe_checkout_wait
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(BASE_DIR, "data")
-os.makedirs(DATA_DIR, exist_ok=True)
 
-DB_PATH = os.path.join(DATA_DIR, "books.db")
+DB_PATH = os.getenv("BOOKS_DB_PATH", os.path.join(DATA_DIR, "books.db"))
 SQL_DB_URL = f"sqlite:///{DB_PATH}"
+ASYNC_SQL_DB_URL = f"sqlite+aiosqlite:///{DB_PATH}"
+
+
+@dataclass(frozen=True)
+class EngineProfile:
+    """SQLite pragmas and pool sizes; every field can be overridden with a BOOKS_DB_* variable."""
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"
+    cache_size_kib: int = 65_536
+    mmap_size: int = 268_435_456
+    temp_store: str = "MEMORY"
+    busy_timeout_ms: int = 5_000
+    # Stored in the file, not per connection: init_schema applies it when it creates or upgrades the schema.
+    auto_vacuum: str = "INCREMENTAL"
+    read_pool_size: int = 8
+    read_max_overflow: int = 8
+    write_pool_size: int = 1
+    write_max_overflow: int = 0
+    pool_timeout: float = 30.0
+
+    @classmethod
+    def from_env(cls) -> "EngineProfile":
+        """Build a profile from BOOKS_DB_<FIELD> environment variables, falling back to the defaults."""
+        overrides = {}
+        for name, field in cls.__dataclass_fields__.items():
+            value = os.getenv(f"BOOKS_DB_{name.upper()}")
+            if value is not None:
+                overrides[name] = field.type(value)
+        return cls(**overrides)
+
+
+profile = EngineProfile.from_env()
+
+
+def _configure_connection(target: Engine, read_only: bool = False) -> None:
+    """Apply the profile pragmas to each new DBAPI connection opened by `target`."""
+
+    @event.listens_for(target, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA journal_mode={profile.journal_mode}")
+        cursor.execute(f"PRAGMA synchronous={profile.synchronous}")
+        cursor.execute(f"PRAGMA cache_size=-{profile.cache_size_kib}")
+        cursor.execute(f"PRAGMA mmap_size={profile.mmap_size}")
+        cursor.execute(f"PRAGMA temp_store={profile.temp_store}")
+        cursor.execute(f"PRAGMA busy_timeout={profile.busy_timeout_ms}")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
 
+# Engines connect lazily; the data directory and schema are created by lifecycle.init_schema().
+
+# Synchronous engine: schema creation and maintenance scripts only.
 engine = create_engine(SQL_DB_URL, connect_args={"check_same_thread": False})
+_configure_connection(engine)
+instrument_engine(engine, "sync")
 
 SessionLocal = sessionmaker(autoflush=False, autocommit=False, bind=engine)
 
+# Asynchronous engines used by the request handlers. SQLite allows a single writer, so the
+# read-write pool stays small while read-only endpoints get their own, larger pool.
+async_engine = create_async_engine(
+    ASYNC_SQL_DB_URL,
+    pool_size=profile.write_pool_size,
+    max_overflow=profile.write_max_overflow,
+    pool_timeout=profile.pool_timeout,
+)
+_configure_connection(async_engine.sync_engine)
+instrument_engine(async_engine.sync_engine, "write")
+
+read_engine = create_async_engine(
+    ASYNC_SQL_DB_URL,
+    pool_size=profile.read_pool_size,
+    max_overflow=profile.read_max_overflow,
+    pool_timeout=profile.pool_timeout,
+)
+_configure_connection(read_engine.sync_engine, read_only=True)
+instrument_engine(read_engine.sync_engine, "read")
+
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+ReadOnlySessionLocal = async_sessionmaker(read_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 
-def get_db() -> Generator[Session, None, None]:
-    """Dependency that provides a SQLAlchemy session and ensures it is closed after use."""
-    db = SessionLocal()
-    try:
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    """Dependency that provides a read-write async SQLAlchemy session and ensures it is closed after use."""
+    async with AsyncSessionLocal() as db:
+        await checkout(db, "write")
         yield db
-    finally:
-        db.close()
+
+
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """Dependency that provides a read-only async session from the read pool."""
+    async with ReadOnlySessionLocal() as db:
+        await checkout(db, "read")
+        yield db
+
+
+async def checkout(db: AsyncSession, pool: str) -> None:
+    """Acquire the session's connection up front so the pool wait is measured on its own."""
+    start = time.perf_counter()
+    await db.connection()
+    observe_checkout_wait(time.perf_counter() - start, pool)
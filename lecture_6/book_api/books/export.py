@@ -0,0 +1,203 @@
+import csv
+import io
+import zlib
+from abc import ABC, abstractmethod
+from enum import Enum
+from typing import AsyncIterator, List, Optional
+
+from sqlalchemy.engine import Row
+
+from .pagination import iter_book_rows
+from .responses import dumps, rows_to_dicts
+
+EXPORT_CHUNK_SIZE = 10_000
+FIELDS = ["id", "title", "author", "year"]
+
+
+class ExportFormat(str, Enum):
+    csv = "csv"
+    ndjson = "ndjson"
+    parquet = "parquet"
+    arrow = "arrow"
+
+
+class ExportCompression(str, Enum):
+    none = "none"
+    gzip = "gzip"
+    zstd = "zstd"
+
+
+class ExportUnavailable(Exception):
+    """The requested format or compression needs an optional package that is not installed."""
+
+
+MEDIA_TYPES = {
+    ExportFormat.csv: "text/csv",
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.parquet: "application/vnd.apache.parquet",
+    ExportFormat.arrow: "application/vnd.apache.arrow.stream",
+}
+EXTENSIONS = {ExportFormat.csv: "csv", ExportFormat.ndjson: "ndjson", ExportFormat.parquet: "parquet",
+              ExportFormat.arrow: "arrows"}
+
+
+def _columnar(fmt: ExportFormat) -> bool:
+    # Parquet and Arrow compress inside the file (per column), so they are never wrapped in gzip/zstd.
+    return fmt in (ExportFormat.parquet, ExportFormat.arrow)
+
+
+def media_type(fmt: ExportFormat, compression: ExportCompression) -> str:
+    if _columnar(fmt) or compression is ExportCompression.none:
+        return MEDIA_TYPES[fmt]
+    return "application/gzip" if compression is ExportCompression.gzip else "application/zstd"
+
+
+def filename(fmt: ExportFormat, compression: ExportCompression) -> str:
+    name = f"books.{EXTENSIONS[fmt]}"
+    if not _columnar(fmt) and compression is not ExportCompression.none:
+        name += ".gz" if compression is ExportCompression.gzip else ".zst"
+    return name
+
+
+class _Sink(io.RawIOBase):
+    """Write-only file object that hands back whatever was written since the last drain."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._parts: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+class _Encoder(ABC):
+    """Turns row chunks into bytes; `finish` returns any trailer (e.g. a Parquet footer)."""
+
+    @abstractmethod
+    def encode(self, rows: List[Row]) -> bytes:
+        """Bytes for one chunk of rows."""
+
+    def finish(self) -> bytes:
+        return b""
+
+
+class _CsvEncoder(_Encoder):
+    def __init__(self) -> None:
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, lineterminator="\n")
+        self._writer.writerow(FIELDS)
+
+    def encode(self, rows: List[Row]) -> bytes:
+        self._writer.writerows(rows)
+        data = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return data.encode()
+
+
+class _NdjsonEncoder(_Encoder):
+    def encode(self, rows: List[Row]) -> bytes:
+        return b"".join(dumps(book) + b"\n" for book in rows_to_dicts(rows))
+
+
+class _ArrowEncoder(_Encoder):
+    """Parquet (one row group per chunk) or Arrow IPC stream (one record batch per chunk)."""
+
+    def __init__(self, fmt: ExportFormat, compression: ExportCompression) -> None:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ExportUnavailable(f"{fmt.value} export requires the 'pyarrow' package")
+        self._pa = pa
+        self._schema = pa.schema([
+            ("id", pa.int64()), ("title", pa.string()), ("author", pa.string()), ("year", pa.int32()),
+        ])
+        self._sink = _Sink()
+        codec = None if compression is ExportCompression.none else compression.value
+        if fmt is ExportFormat.parquet:
+            self._writer = pq.ParquetWriter(self._sink, self._schema, compression=codec or "none")
+        else:
+            if compression is ExportCompression.gzip:
+                raise ValueError("Arrow IPC streams support zstd compression, not gzip")
+            options = pa.ipc.IpcWriteOptions(compression=codec)
+            self._writer = pa.ipc.new_stream(self._sink, self._schema, options=options)
+
+    def encode(self, rows: List[Row]) -> bytes:
+        columns = list(zip(*rows))
+        self._writer.write_table(self._pa.Table.from_arrays(
+            [self._pa.array(values, type=field.type) for values, field in zip(columns, self._schema)],
+            schema=self._schema,
+        ))
+        return self._sink.drain()
+
+    def finish(self) -> bytes:
+        self._writer.close()
+        return self._sink.drain()
+
+
+class _Compressor:
+    def __init__(self, compression: ExportCompression) -> None:
+        if compression is ExportCompression.gzip:
+            self._compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 writes a gzip container
+        else:
+            try:
+                import zstandard
+            except ImportError:
+                raise ExportUnavailable("zstd compression requires the 'zstandard' package")
+            self._compressor = zstandard.ZstdCompressor().compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+
+def open_export(fmt: ExportFormat, compression: ExportCompression) -> "tuple[_Encoder, Optional[_Compressor]]":
+    """Prepare the encoder (and outer compressor) up front so bad options fail before streaming.
+
+    Raises ValueError for unsupported combinations and ExportUnavailable for missing optional packages.
+    """
+    if _columnar(fmt):
+        return _ArrowEncoder(fmt, compression), None
+    encoder = _CsvEncoder() if fmt is ExportFormat.csv else _NdjsonEncoder()
+    compressor = None if compression is ExportCompression.none else _Compressor(compression)
+    return encoder, compressor
+
+
+async def iter_export(
+        encoder: _Encoder,
+        compressor: Optional[_Compressor],
+        chunk_size: int = EXPORT_CHUNK_SIZE,
+        chunks: Optional[AsyncIterator[List[Row]]] = None,
+) -> AsyncIterator[bytes]:
+    """Stream the books through `encoder` chunk by chunk; memory use does not grow with the table.
+
+    `chunks` defaults to reading the SQLite table; the export endpoint passes its repository's rows.
+    """
+    async for rows in chunks or iter_book_rows(chunk_size):
+        data = encoder.encode(rows)
+        if compressor is not None:
+            data = compressor.compress(data)
+        if data:
+            yield data
+    tail = encoder.finish()
+    if compressor is not None:
+        tail = compressor.compress(tail) + compressor.flush()
+    if tail:
+        yield tail
@@ -0,0 +1,146 @@
+import asyncio
+import logging
+import os
+from contextlib import contextmanager
+from typing import Iterator
+
+from sqlalchemy import select, text
+from sqlalchemy.engine import Connection
+
+from .autocomplete import autocomplete
+from .database import DB_PATH, AsyncSessionLocal, ReadOnlySessionLocal, async_engine, engine, profile, read_engine
+from .models import BOOK_COLUMNS, Base, Book
+from .repository import memory_repository
+from .search_index import build_search_statement, ensure_search_index
+from .stats import ensure_stats
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger("book_api.lifecycle")
+
+# Bump whenever init_schema learns to create something new, so existing databases pick it up.
+SCHEMA_VERSION = 4
+
+# Indexes made redundant by the composite indexes on `books`.
+_DROPPED_INDEXES = ("ix_books_author", "ix_books_year")
+
+_AUTO_VACUUM_MODES = {"NONE": 0, "FULL": 1, "INCREMENTAL": 2}
+
+
+@contextmanager
+def file_lock(path: str) -> Iterator[None]:
+    """Exclusive inter-process lock held on `path` for the duration of the block."""
+    with open(path, "a+b") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        else:
+            msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+            else:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def init_schema() -> None:
+    """Create the data directory, tables, search index and aggregates once, even with many workers starting together.
+
+    Workers serialise on a lock file next to the database; the first one does the work and records
+    SCHEMA_VERSION in `PRAGMA user_version`, the others see it and return immediately.
+    """
+    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+    with file_lock(DB_PATH + ".lock"):
+        with engine.connect() as connection:
+            _set_auto_vacuum(connection)
+            if connection.execute(text("PRAGMA user_version")).scalar() >= SCHEMA_VERSION:
+                return
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as connection:
+            # create_all skips existing tables, so add indexes declared since the table was created.
+            for index in Book.__table__.indexes:
+                index.create(bind=connection, checkfirst=True)
+            for name in _DROPPED_INDEXES:
+                connection.execute(text(f"DROP INDEX IF EXISTS {name}"))
+            ensure_search_index(connection)
+            ensure_stats(connection)
+            connection.execute(text(f"PRAGMA user_version = {SCHEMA_VERSION}"))
+
+
+def _set_auto_vacuum(connection: Connection) -> None:
+    """Switch a new, still empty file to profile.auto_vacuum.
+
+    The mode only takes effect through a full VACUUM once the file has a header, which switching to
+    WAL on connect already writes. That is instant on an empty file; an existing catalog would be
+    rewritten while start-up waits, so it is only reported here and left to `convert_auto_vacuum`.
+    """
+    mode = _AUTO_VACUUM_MODES[profile.auto_vacuum.upper()]
+    if connection.exec_driver_sql("PRAGMA auto_vacuum").scalar() == mode:
+        return
+    if connection.exec_driver_sql("SELECT 1 FROM sqlite_master LIMIT 1").first() is not None:
+        logger.warning(
+            "auto_vacuum is not %s yet; run `python -m book_api convert-auto-vacuum` while the API is stopped",
+            profile.auto_vacuum.upper(),
+        )
+        return
+    connection.exec_driver_sql(f"PRAGMA auto_vacuum = {mode}")
+    connection.exec_driver_sql("VACUUM")
+
+
+def convert_auto_vacuum() -> bool:
+    """Rewrite the file with a full VACUUM to apply profile.auto_vacuum; False if it already uses it.
+
+    VACUUM copies the whole database and holds off every writer meanwhile, so this is an offline
+    command rather than part of start-up or the maintenance passes.
+    """
+    mode = _AUTO_VACUUM_MODES[profile.auto_vacuum.upper()]
+    with file_lock(DB_PATH + ".maintenance.lock"), engine.connect() as connection:
+        if connection.exec_driver_sql("PRAGMA auto_vacuum").scalar() == mode:
+            return False
+        connection.exec_driver_sql(f"PRAGMA auto_vacuum = {mode}")
+        connection.exec_driver_sql("VACUUM")
+    return True
+
+
+def build_autocomplete() -> None:
+    """Load the autocomplete prefix index from the database; the write handlers keep it current afterwards."""
+    with engine.connect() as connection:
+        autocomplete.build(connection)
+
+
+def load_repository() -> None:
+    """Read the catalog into the in-memory repository when BOOKS_STORAGE=memory."""
+    if memory_repository is not None:
+        with engine.connect() as connection:
+            memory_repository.load(connection)
+
+
+async def warm_up() -> None:
+    """Open the pooled connections and run the hot queries once so their statements are prepared."""
+    read_statements = [
+        select(*BOOK_COLUMNS).where(Book.id > 0).order_by(Book.id).limit(1),
+        build_search_statement("a", None, None).limit(1),
+        build_search_statement(None, None, 2000).limit(1),
+    ]
+
+    async def prime(session_factory, statements) -> None:
+        async with session_factory() as db:
+            for statement in statements:
+                await db.execute(statement)
+
+    # Sessions run concurrently, so each one checks out (and opens) a different pooled connection.
+    await asyncio.gather(*(prime(ReadOnlySessionLocal, read_statements) for _ in range(profile.read_pool_size)))
+    await prime(AsyncSessionLocal, [select(1)])
+
+
+async def dispose_engines() -> None:
+    """Close every pooled connection."""
+    await async_engine.dispose()
+    await read_engine.dispose()
+    engine.dispose()
@@ -0,0 +1,243 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from .database import DB_PATH, engine
+from .lifecycle import file_lock
+from .metrics import MAINTENANCE_LAST_RUN, MAINTENANCE_PAGES_FREED, MAINTENANCE_STEP_DURATION
+
+logger = logging.getLogger("book_api.maintenance")
+
+_AUTO_VACUUM_INCREMENTAL = 2
+# Lock timeout while waiting for a TRUNCATE checkpoint, which holds off writers as long as it waits.
+_TRUNCATE_BUSY_TIMEOUT_MS = 50
+
+
+@dataclass
+class MaintenanceRun:
+    """What one maintenance pass found and did, step by step."""
+    started_at: float
+    duration: float = 0.0
+    steps: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    error: Optional[str] = None
+
+
+class DatabaseMaintenance:
+    """Background task that keeps the database file compact, its WAL short and its planner statistics fresh.
+
+    Every `interval` seconds a pass checks the file and only does what is due:
+
+    - analyze: ANALYZE, sampling at most `analysis_limit` rows per index, once the catalog size moved
+      by more than `analyze_drift` since the last one or `analyze_interval` seconds have passed;
+    - vacuum: `PRAGMA incremental_vacuum` in steps of `vacuum_step_pages`, each its own short
+      transaction with a pause in between, until the free list is empty or `budget_ms` is spent
+      (the rest is left for the next pass);
+    - checkpoint: a PASSIVE WAL checkpoint, which never waits for readers or writers; once the WAL
+      file is larger than `checkpoint_bytes` and fully copied, a TRUNCATE checkpoint that gives up
+      after a few milliseconds instead of holding off the write queue.
+
+    The pass runs on the synchronous engine in a worker thread and takes a lock file, so with several
+    workers only one of them maintains the file at a time; the others find nothing left to do.
+    """
+
+    def __init__(
+            self,
+            interval: float = 300.0,
+            budget_ms: float = 250.0,
+            vacuum_step_pages: int = 256,
+            step_pause_ms: float = 20.0,
+            checkpoint_bytes: int = 16 * 2**20,
+            analyze_interval: float = 3600.0,
+            analyze_drift: float = 0.1,
+            analysis_limit: int = 1000,
+    ) -> None:
+        self.interval = interval
+        self.budget_ms = budget_ms
+        self.vacuum_step_pages = vacuum_step_pages
+        self.step_pause_ms = step_pause_ms
+        self.checkpoint_bytes = checkpoint_bytes
+        self.analyze_interval = analyze_interval
+        self.analyze_drift = analyze_drift
+        self.analysis_limit = analysis_limit
+        self.last_run: Optional[MaintenanceRun] = None
+        self.runs = 0
+        self.running = False  # a pass is in progress
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._stopping = threading.Event()
+        # Catalog size at the last ANALYZE and when it ran (monotonic); read from sqlite_stat1 on the first pass.
+        self._analyzed_rows: Optional[int] = None
+        self._analyzed_at: Optional[float] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0
+
+    @property
+    def scheduled(self) -> bool:
+        """Whether the background task that starts the passes is alive."""
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        """Schedule passes on the running event loop; an interval of 0 disables maintenance."""
+        if not self.enabled or self.scheduled:
+            return
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._run(), name="book_api-maintenance")
+
+    async def stop(self) -> None:
+        """Cancel the schedule; a pass in progress stops after its current step."""
+        if not self.scheduled:
+            return
+        self._stopping.set()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await run_in_threadpool(self.run_once)
+            except Exception:
+                logger.exception("database maintenance pass failed")
+
+    def run_once(self) -> MaintenanceRun:
+        """Run one pass now, blocking; the background task calls this in a worker thread."""
+        run = MaintenanceRun(started_at=time.time())
+        MAINTENANCE_LAST_RUN.set(run.started_at)
+        start = time.perf_counter()
+        deadline = start + self.budget_ms / 1000
+        self.running = True
+        try:
+            with file_lock(DB_PATH + ".maintenance.lock"):
+                connection = engine.raw_connection()
+                try:
+                    self._analyze(connection, run)
+                    self._vacuum(connection, run, deadline)
+                    self._checkpoint(connection, run)
+                finally:
+                    connection.close()
+        except Exception as exc:
+            run.error = f"{type(exc).__name__}: {exc}"
+            raise
+        finally:
+            run.duration = time.perf_counter() - start
+            self.last_run = run
+            self.runs += 1
+            self.running = False
+        return run
+
+    @contextmanager
+    def _step(self, run: MaintenanceRun, name: str) -> Iterator[Dict[str, Any]]:
+        detail = run.steps[name] = {}
+        start = time.perf_counter()
+        try:
+            yield detail
+        finally:
+            elapsed = time.perf_counter() - start
+            detail["duration_ms"] = round(elapsed * 1000, 3)
+            MAINTENANCE_STEP_DURATION.observe(elapsed, step=name)
+
+    def _analyze(self, connection, run: MaintenanceRun) -> None:
+        with self._step(run, "analyze") as detail:
+            rows = _scalar(connection, "SELECT COALESCE(SUM(book_count), 0) FROM book_year_stats")
+            if self._analyzed_rows is None:
+                self._analyzed_rows = _analyzed_rows(connection)
+                if self._analyzed_rows is not None:
+                    self._analyzed_at = time.monotonic()
+            baseline = self._analyzed_rows
+            due = (
+                baseline is None
+                or abs(rows - baseline) > self.analyze_drift * max(baseline, 1)
+                or time.monotonic() - self._analyzed_at >= self.analyze_interval
+            )
+            detail.update(rows=rows, analyzed_rows=baseline, analyzed=due)
+            if not due:
+                return
+            cursor = connection.cursor()
+            cursor.execute(f"PRAGMA analysis_limit = {self.analysis_limit}")
+            cursor.execute("ANALYZE")
+            cursor.close()
+            self._analyzed_rows, self._analyzed_at = rows, time.monotonic()
+
+    def _vacuum(self, connection, run: MaintenanceRun, deadline: float) -> None:
+        with self._step(run, "vacuum") as detail:
+            free = _scalar(connection, "PRAGMA freelist_count")
+            detail["free_pages"] = free
+            freed = 0
+            if _scalar(connection, "PRAGMA auto_vacuum") == _AUTO_VACUUM_INCREMENTAL:
+                # At least one step per pass, even when ANALYZE used up the budget.
+                while free and not self._stopping.is_set():
+                    # executescript steps the pragma to the end; a plain execute() frees a single page.
+                    connection.driver_connection.executescript(f"PRAGMA incremental_vacuum({self.vacuum_step_pages})")
+                    remaining = _scalar(connection, "PRAGMA freelist_count")
+                    freed += max(free - remaining, 0)
+                    free = remaining
+                    if time.perf_counter() >= deadline:
+                        break
+                    time.sleep(self.step_pause_ms / 1000)  # let the write queue take the lock
+            detail.update(freed_pages=freed, remaining_pages=free)
+            if freed:
+                MAINTENANCE_PAGES_FREED.inc(freed)
+
+    def _checkpoint(self, connection, run: MaintenanceRun) -> None:
+        with self._step(run, "checkpoint") as detail:
+            busy, frames, copied = connection.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchone()
+            wal_bytes = os.path.getsize(DB_PATH + "-wal") if os.path.exists(DB_PATH + "-wal") else 0
+            detail.update(wal_bytes=wal_bytes, wal_frames=frames, checkpointed_frames=copied, truncated=False)
+            if busy or frames != copied or wal_bytes < self.checkpoint_bytes:
+                return
+            busy_timeout = _scalar(connection, "PRAGMA busy_timeout")
+            connection.execute(f"PRAGMA busy_timeout = {_TRUNCATE_BUSY_TIMEOUT_MS}")
+            try:
+                busy, _, _ = connection.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+            finally:
+                connection.execute(f"PRAGMA busy_timeout = {busy_timeout}")
+            detail["truncated"] = not busy
+
+    def status(self) -> Dict[str, Any]:
+        run = self.last_run
+        return {
+            "enabled": self.enabled,
+            "scheduled": self.scheduled,
+            "running": self.running,
+            "interval_seconds": self.interval,
+            "runs": self.runs,
+            "last_run_at": run.started_at if run else None,
+            "last_duration_ms": round(run.duration * 1000, 3) if run else None,
+            "last_error": run.error if run else None,
+            "last_steps": run.steps if run else {},
+        }
+
+
+def _scalar(connection, sql: str) -> Any:
+    row = connection.execute(sql).fetchone()
+    return row[0] if row else None
+
+
+def _analyzed_rows(connection) -> Optional[int]:
+    """Row count of `books` recorded by the last ANALYZE (first number of an index's stat), or None."""
+    if not _scalar(connection, "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"):
+        return None
+    stat = _scalar(connection, "SELECT stat FROM sqlite_stat1 WHERE tbl = 'books' AND idx IS NOT NULL LIMIT 1")
+    return int(stat.split()[0]) if stat else None
+
+
+maintenance = DatabaseMaintenance(
+    interval=float(os.getenv("BOOKS_MAINTENANCE_INTERVAL", "300")),
+    budget_ms=float(os.getenv("BOOKS_MAINTENANCE_BUDGET_MS", "250")),
+    vacuum_step_pages=int(os.getenv("BOOKS_MAINTENANCE_VACUUM_STEP_PAGES", "256")),
+    checkpoint_bytes=int(os.getenv("BOOKS_MAINTENANCE_CHECKPOINT_BYTES", str(16 * 2**20))),
+    analyze_interval=float(os.getenv("BOOKS_MAINTENANCE_ANALYZE_INTERVAL", "3600")),
+    analyze_drift=float(os.getenv("BOOKS_MAINTENANCE_ANALYZE_DRIFT", "0.1")),
+)
@@ -0,0 +1,273 @@
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, Iterator, Optional, Sequence, Tuple
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# Statements slower than this many milliseconds are logged; unset disables the slow-query log.
+SLOW_QUERY_MS = float(os.getenv("BOOKS_SLOW_QUERY_MS", "0")) or None
+
+slow_query_logger = logging.getLogger("book_api.sql.slow")
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Cumulative Prometheus-style histogram keyed by label values."""
+
+    def __init__(self, name: str, documentation: str, buckets: Sequence[float]) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self._series: Dict[Labels, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # Per-bucket counts followed by the running sum and the total count.
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {key: list(series) for key, series in self._series.items()}
+        for key, series in sorted(snapshot.items()):
+            for bound, count in zip(self.buckets, series):
+                lines.append(f"{self.name}_bucket{_format_labels(key + (('le', str(bound)),))} {count}")
+            lines.append(f"{self.name}_bucket{_format_labels(key + (('le', '+Inf'),))} {series[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {series[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {series[-1]}")
+        return "\n".join(lines)
+
+
+class Counter:
+    """Monotonic Prometheus-style counter keyed by label values."""
+
+    def __init__(self, name: str, documentation: str) -> None:
+        self.name = name
+        self.documentation = documentation
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            snapshot = dict(self._values)
+        for key, value in sorted(snapshot.items()):
+            lines.append(f"{self.name}{_format_labels(key)} {value}")
+        return "\n".join(lines)
+
+
+class Gauge:
+    """Prometheus-style gauge keyed by label values; holds the last value set."""
+
+    def __init__(self, name: str, documentation: str) -> None:
+        self.name = name
+        self.documentation = documentation
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def set(self, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = value
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge"]
+        with self._lock:
+            snapshot = dict(self._values)
+        for key, value in sorted(snapshot.items()):
+            lines.append(f"{self.name}{_format_labels(key)} {value}")
+        return "\n".join(lines)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels) -> str:
+    """Render label pairs as {name="value",...} in the Prometheus text format."""
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+REQUEST_DURATION = Histogram(
+    "book_api_request_duration_seconds", "HTTP request latency by route.", LATENCY_BUCKETS
+)
+REQUEST_STATEMENTS = Histogram(
+    "book_api_request_sql_statements", "SQL statements executed per request, by route.", COUNT_BUCKETS
+)
+REQUEST_SQL_DURATION = Histogram(
+    "book_api_request_sql_duration_seconds", "Total time spent in SQL per request, by route.", LATENCY_BUCKETS
+)
+STATEMENT_DURATION = Histogram(
+    "book_api_sql_statement_duration_seconds", "Duration of individual SQL statements by engine.", LATENCY_BUCKETS
+)
+POOL_CHECKOUT_WAIT = Histogram(
+    "book_api_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection.", LATENCY_BUCKETS
+)
+SLOW_QUERIES = Counter("book_api_slow_queries_total", "Statements slower than BOOKS_SLOW_QUERY_MS.")
+WRITE_BATCH_SIZE = Histogram(
+    "book_api_write_batch_operations", "Write operations committed together by the write queue.", COUNT_BUCKETS
+)
+WRITE_BATCH_DURATION = Histogram(
+    "book_api_write_batch_duration_seconds", "Time to apply and commit one group of writes.", LATENCY_BUCKETS
+)
+WRITE_QUEUE_REJECTED = Counter(
+    "book_api_write_queue_rejected_total", "Writes refused because the write queue stayed full."
+)
+AUTOCOMPLETE_ENTRIES = Gauge("book_api_autocomplete_entries", "Distinct titles and authors in the autocomplete index.")
+AUTOCOMPLETE_MEMORY = Gauge("book_api_autocomplete_memory_bytes", "Approximate memory used by the autocomplete index.")
+MAINTENANCE_LAST_RUN = Gauge(
+    "book_api_maintenance_last_run_timestamp_seconds", "Unix time at which the last database maintenance pass started."
+)
+MAINTENANCE_STEP_DURATION = Histogram(
+    "book_api_maintenance_step_duration_seconds", "Duration of database maintenance steps.", LATENCY_BUCKETS
+)
+MAINTENANCE_PAGES_FREED = Counter(
+    "book_api_maintenance_pages_freed_total", "Free pages returned to the file system by incremental vacuum."
+)
+
+REGISTRY = [
+    REQUEST_DURATION, REQUEST_STATEMENTS, REQUEST_SQL_DURATION, STATEMENT_DURATION, POOL_CHECKOUT_WAIT, SLOW_QUERIES,
+    WRITE_BATCH_SIZE, WRITE_BATCH_DURATION, WRITE_QUEUE_REJECTED, AUTOCOMPLETE_ENTRIES, AUTOCOMPLETE_MEMORY,
+    MAINTENANCE_LAST_RUN, MAINTENANCE_STEP_DURATION, MAINTENANCE_PAGES_FREED,
+]
+
+
+def render_metrics() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    return "\n".join(metric.render() for metric in REGISTRY) + "\n"
+
+
+@dataclass
+class RequestStats:
+    """SQL accounting for the request currently being served."""
+    route: str = "<background>"
+    statements: int = 0
+    sql_seconds: float = 0.0
+
+
+_current_request: ContextVar[Optional[RequestStats]] = ContextVar("book_api_request_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    """Stats of the request being served, for work done on its behalf by another task (the write queue)."""
+    return _current_request.get()
+
+
+@contextmanager
+def attributed_to(stats: Optional[RequestStats]) -> Iterator[None]:
+    """Count the statements executed inside the block towards `stats` (e.g. a request captured earlier)."""
+    token = _current_request.set(stats)
+    try:
+        yield
+    finally:
+        _current_request.reset(token)
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """Count and time every statement `engine` executes, attributing it to the current request."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_timer(conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def stop_timer(conn, cursor, statement, parameters, context, executemany) -> None:
+        elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+        STATEMENT_DURATION.observe(elapsed, engine=name)
+        stats = _current_request.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.sql_seconds += elapsed
+        if SLOW_QUERY_MS is not None and elapsed * 1000 >= SLOW_QUERY_MS:
+            route = stats.route if stats is not None else "<background>"
+            SLOW_QUERIES.inc(engine=name)
+            slow_query_logger.warning(
+                "slow query (%.1f ms, engine=%s, route=%s): %s", elapsed * 1000, name, route, " ".join(statement.split())
+            )
+
+
+def observe_checkout_wait(seconds: float, pool: str) -> None:
+    """Record how long a session waited for a connection from `pool`."""
+    POOL_CHECKOUT_WAIT.observe(seconds, pool=pool)
+
+
+def _route_template(request: Request) -> str:
+    """Route path template (e.g. /books/{book_id}) so label cardinality stays bounded."""
+    route = request.scope.get("route")
+    if route is None:
+        # Responses served by middleware (e.g. cache hits) never reach the router; match it here.
+        for candidate in request.app.routes:
+            if candidate.matches(request.scope)[0] == Match.FULL:
+                route = candidate
+                break
+    return getattr(route, "path", "<unmatched>")
+
+
+class MetricsMiddleware:
+    """Record request latency and per-request SQL statement counts and time.
+
+    Plain ASGI rather than BaseHTTPMiddleware, so a streamed response is timed until its last body
+    chunk is sent and the SQL run while it streams counts towards the request.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(route=scope["path"])
+        token = _current_request.set(stats)
+        start = time.perf_counter()
+        end: Optional[float] = None
+        status = 500
+
+        async def send_and_time(message: Message) -> None:
+            nonlocal end, status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                end = time.perf_counter()
+
+        try:
+            await self.app(scope, receive, send_and_time)
+        finally:
+            elapsed = (end or time.perf_counter()) - start
+            _current_request.reset(token)
+            request = Request(scope)
+            route = stats.route = _route_template(request)
+            REQUEST_DURATION.observe(elapsed, method=request.method, route=route, status=str(status))
+            REQUEST_STATEMENTS.observe(stats.statements, method=request.method, route=route)
+            REQUEST_SQL_DURATION.observe(stats.sql_seconds, method=request.method, route=route)
@@ -1,15 +1,41 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Index, Integer, String
 from .database import Base
 
 
 
 class Book(Base):
     __tablename__ = "books"
+    # Composite indexes for the filter and sort combinations search uses; their leading columns also
+    # serve lookups on author or year alone, so those no longer need single-column indexes.
+    __table_args__ = (
+        Index("ix_books_author_year", "author", "year"),
+        Index("ix_books_year_title", "year", "title"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False, index=True)
-    author = Column(String(100), nullable=False, index=True)
-    year = Column(Integer, nullable=True, index=True)
+    author = Column(String(100), nullable=False)
+    year = Column(Integer, nullable=True)
 
     def __repr__(self):
         return f"<Book(id={self.id}, title={self.title}, author={self.author}, year={self.year})>"
+
+
+class AuthorStats(Base):
+    """Number of books per author, kept exact by triggers on `books` (see stats.py)."""
+    __tablename__ = "book_author_stats"
+
+    author = Column(String(100), primary_key=True)
+    book_count = Column(Integer, nullable=False, index=True)
+
+
+class YearStats(Base):
+    """Number of books per publication year, kept exact by triggers on `books`; year 0 counts books without a year."""
+    __tablename__ = "book_year_stats"
+
+    year = Column(Integer, primary_key=True, autoincrement=False)
+    book_count = Column(Integer, nullable=False)
+
+
+# Plain column list for Core selects and RETURNING clauses that skip ORM object construction.
+BOOK_COLUMNS = (Book.id, Book.title, Book.author, Book.year)
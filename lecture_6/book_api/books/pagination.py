@@ -0,0 +1,57 @@
+import base64
+import json
+from typing import AsyncIterator, List
+
+from sqlalchemy import select
+from sqlalchemy.engine import Row
+
+from .database import ReadOnlySessionLocal, checkout
+from .models import BOOK_COLUMNS, Book
+from .responses import dumps, rows_to_dicts
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+STREAM_CHUNK_SIZE = 1000
+
+
+def encode_cursor(last_id: int) -> str:
+    """Encode the id of the last returned book into an opaque cursor."""
+    raw = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Decode a cursor produced by `encode_cursor`, raising ValueError if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        last_id = json.loads(raw)["id"]
+    except (ValueError, KeyError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    if not isinstance(last_id, int) or last_id < 0:
+        raise ValueError("Invalid cursor")
+    return last_id
+
+
+async def iter_book_rows(chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[List[Row]]:
+    """Yield the whole table as lists of column tuples, reading it in keyset chunks so memory stays flat."""
+    async with ReadOnlySessionLocal() as db:
+        await checkout(db, "read")
+        last_id = 0
+        while True:
+            result = await db.execute(
+                select(*BOOK_COLUMNS)
+                .where(Book.id > last_id)
+                .order_by(Book.id)
+                .limit(chunk_size)
+            )
+            rows = result.all()
+            if not rows:
+                break
+            yield rows
+            last_id = rows[-1].id
+
+
+async def iter_books_ndjson(chunks: AsyncIterator[List[Row]]) -> AsyncIterator[bytes]:
+    """Yield every book of `chunks` (e.g. `BookRepository.iter_rows()`) as NDJSON, one chunk at a time."""
+    async for rows in chunks:
+        yield b"".join(dumps(book) + b"\n" for book in rows_to_dicts(rows))
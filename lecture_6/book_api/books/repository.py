@@ -0,0 +1,431 @@
+import heapq
+import os
+from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right, insort
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import Select, delete, insert, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .autocomplete import Change, normalize
+from .cache import response_cache
+from .database import get_read_db
+from .models import BOOK_COLUMNS, Book
+from .pagination import STREAM_CHUNK_SIZE, iter_book_rows
+from .search_index import TOKEN_RE, SearchSort, build_search_statement
+from .stats import decade_of, search_facets, sorted_counts
+from .write_queue import write_queue
+
+LOAD_CHUNK_SIZE = 50_000
+
+
+@dataclass(frozen=True)
+class BookQuery:
+    """Search filters understood by every repository; see /books/search/ for their meaning."""
+    title: Optional[str] = None
+    author: Optional[str] = None
+    year: Optional[int] = None
+    year_from: Optional[int] = None
+    year_to: Optional[int] = None
+
+    def is_empty(self) -> bool:
+        return not (self.title or self.author or self.year) and self.year_from is None and self.year_to is None
+
+    def statement(self, sort: SearchSort = SearchSort.relevance) -> Select:
+        return build_search_statement(self.title, self.author, self.year, self.year_from, self.year_to, sort)
+
+
+class BookRow(NamedTuple):
+    """A book as the in-memory backend returns it; has `_fields` like a SQLAlchemy row."""
+    id: int
+    title: str
+    author: str
+    year: Optional[int]
+
+
+class BookRepository(ABC):
+    """Storage for the book catalog as the request handlers use it.
+
+    Reads return rows with `_fields` (SQLAlchemy rows or BookRow), so `rows_to_dicts` and the
+    exporters work with every backend; writes return plain dicts.
+    """
+
+    @abstractmethod
+    async def page(self, after_id: int, limit: int) -> Sequence[Any]:
+        """Up to `limit` books with an ID above `after_id`, in ID order."""
+
+    @abstractmethod
+    def iter_rows(self, chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[List[Any]]:
+        """The whole catalog in ID order, `chunk_size` rows at a time."""
+
+    @abstractmethod
+    async def search(self, query: BookQuery, sort: SearchSort, limit: Optional[int]) -> Sequence[Any]:
+        """Books matching `query` in the order asked for."""
+
+    @abstractmethod
+    async def facets(self, query: BookQuery, top_authors: int) -> Dict:
+        """Author and decade counts over the books matching `query` (see schemas.SearchFacets)."""
+
+    @abstractmethod
+    async def create(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        """Add a book; return it with its ID."""
+
+    @abstractmethod
+    async def update(self, book_id: int, values: Dict[str, Any]) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """Change the given fields; return `(previous, updated)`, or None if there is no such book.
+
+        `previous` carries at least the old title and author, which the autocomplete index needs.
+        """
+
+    @abstractmethod
+    async def delete(self, book_id: int) -> Optional[Dict[str, Any]]:
+        """Remove a book; return it, or None if there is no such book."""
+
+    @property
+    def writes_to_sqlite(self) -> bool:
+        """Whether writes end up in SQLite, so writers going straight to the database (bulk) may be used."""
+        return True
+
+    def apply_committed(self, changes: Iterable[Change]) -> None:
+        """Mirror `(old, new)` rows written to SQLite past the repository (the bulk endpoints)."""
+
+
+class SqlBookRepository(BookRepository):
+    """The SQLite catalog: reads run on a read-only session, writes go through the group-commit write queue."""
+
+    def __init__(self, db: Optional[AsyncSession] = None) -> None:
+        self.db = db
+
+    async def page(self, after_id: int, limit: int) -> Sequence[Any]:
+        result = await self.db.execute(select(*BOOK_COLUMNS).where(Book.id > after_id).order_by(Book.id).limit(limit))
+        return result.all()
+
+    def iter_rows(self, chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[List[Any]]:
+        # Opens its own session: a stream outlives the request's dependencies.
+        return iter_book_rows(chunk_size)
+
+    async def search(self, query: BookQuery, sort: SearchSort, limit: Optional[int]) -> Sequence[Any]:
+        return (await self.db.execute(query.statement(sort).limit(limit))).all()
+
+    async def facets(self, query: BookQuery, top_authors: int) -> Dict:
+        return await search_facets(self.db, None if query.is_empty() else query.statement(), top_authors)
+
+    async def create(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        async def insert_book(db: AsyncSession) -> Dict[str, Any]:
+            result = await db.execute(insert(Book).values(**values).returning(*BOOK_COLUMNS))
+            return result.one()._asdict()
+
+        return await write_queue.submit(insert_book)
+
+    async def update(self, book_id: int, values: Dict[str, Any]) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        if not values:
+            # Nothing to write: read the book on the read pool instead of queueing a SELECT.
+            async with _read_session() as db:
+                row = (await db.execute(select(*BOOK_COLUMNS).where(Book.id == book_id))).first()
+            return None if row is None else (row._asdict(), row._asdict())
+        stmt = update(Book).where(Book.id == book_id).values(**values).returning(*BOOK_COLUMNS)
+        # RETURNING only gives the new values; read the old title and author first if they change.
+        renames = "title" in values or "author" in values
+
+        async def update_book(db: AsyncSession) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+            previous = None
+            if renames:
+                previous = (await db.execute(select(Book.title, Book.author).where(Book.id == book_id))).first()
+            row = (await db.execute(stmt.execution_options(synchronize_session=False))).first()
+            if row is None:
+                return None
+            row = row._asdict()
+            return (previous._asdict() if previous else row), row
+
+        return await write_queue.submit(update_book)
+
+    async def delete(self, book_id: int) -> Optional[Dict[str, Any]]:
+        async def delete_book(db: AsyncSession) -> Optional[Dict[str, Any]]:
+            result = await db.execute(
+                delete(Book).where(Book.id == book_id).returning(*BOOK_COLUMNS)
+                .execution_options(synchronize_session=False)
+            )
+            row = result.first()
+            return row._asdict() if row else None
+
+        return await write_queue.submit(delete_book)
+
+
+def _words(text: str) -> str:
+    """Normalized tokens, each preceded by a space, so `" " + token in words` is a word-prefix test."""
+    return "".join(" " + word for word in TOKEN_RE.findall(normalize(text)))
+
+
+def _tokens(term: str) -> List[str]:
+    return [" " + token for token in TOKEN_RE.findall(normalize(term))]
+
+
+class BookRecord:
+    """One book of the in-memory catalog; `words` holds the normalized title tokens for searching."""
+    __slots__ = ("id", "title", "author", "year", "words")
+
+    def __init__(self, id: int, title: str, author: str, year: Optional[int]) -> None:
+        self.id = id
+        self.title = title
+        self.author = author
+        self.year = year
+        self.words = _words(title)
+
+    def row(self) -> BookRow:
+        return BookRow(self.id, self.title, self.author, self.year)
+
+
+def _year_key(year: Optional[int]) -> Tuple[bool, int]:
+    # SQLite sorts NULL before every number.
+    return year is not None, year or 0
+
+
+# Same orders as search_index._SORT_ORDERS, ties broken by ID as the composite indexes do (rowid is
+# their last column); relevance has no bm25 here and falls back to ID order.
+_SORT_KEYS: Dict[SearchSort, Tuple[Callable[[BookRecord], Any], bool]] = {
+    SearchSort.relevance: (lambda r: r.id, False),
+    SearchSort.title: (lambda r: (r.title, r.id), False),
+    SearchSort.title_desc: (lambda r: (r.title, r.id), True),
+    SearchSort.year: (lambda r: (_year_key(r.year), r.title, r.id), False),
+    SearchSort.year_desc: (lambda r: (_year_key(r.year), r.title, r.id), True),
+    SearchSort.author: (lambda r: (r.author, _year_key(r.year), r.id), False),
+}
+
+
+class InMemoryBookRepository(BookRepository):
+    """The whole catalog in memory as `__slots__` records with dict indexes on ID, author and year.
+
+    Reads never touch SQLite. With `write_through` every write is committed to SQLite first
+    (through SqlBookRepository and the write queue) and mirrored here once it succeeded, so the
+    database stays the source of truth and is what the next start-up loads. Without it the data
+    lives in this process only, which suits tests and benchmarks of the HTTP layer; IDs are then
+    allocated here, so the bulk endpoints, which write to SQLite directly, are refused.
+
+    The copy is per process and only sees the writes that process made, so with several workers
+    the copies would drift apart for good; this backend is refused unless WEB_CONCURRENCY is 1.
+
+    Every change bumps the response cache version once the records are updated. The write queue
+    already invalidated it at commit, but a request served in between may have cached the old state.
+
+    Title and author filters match word prefixes like the FTS index; author filters are tested once
+    per distinct author and then use the author index. Text searches sorted by relevance come back
+    in ID order, as there is no bm25 score here.
+    """
+
+    def __init__(self, write_through: bool = True) -> None:
+        self.write_through = write_through
+        self._sql = SqlBookRepository()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._by_id: Dict[int, BookRecord] = {}
+        self._ids: List[int] = []
+        self._by_author: Dict[str, Set[int]] = {}
+        self._author_words: Dict[str, str] = {}
+        self._by_year: Dict[Optional[int], Set[int]] = {}
+        self._next_id = 1
+
+    def load(self, connection: Connection) -> None:
+        """Read the books table into memory; called once at start-up."""
+        self._reset()
+        result = connection.execution_options(yield_per=LOAD_CHUNK_SIZE).execute(
+            select(*BOOK_COLUMNS).order_by(Book.id)
+        )
+        for row in result.tuples():
+            self._add(BookRecord(*row))
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def _add(self, record: BookRecord) -> None:
+        self._by_id[record.id] = record
+        if not self._ids or record.id > self._ids[-1]:
+            self._ids.append(record.id)
+        else:
+            insort(self._ids, record.id)
+        authors = self._by_author.get(record.author)
+        if authors is None:
+            authors = self._by_author[record.author] = set()
+            self._author_words[record.author] = _words(record.author)
+        authors.add(record.id)
+        self._by_year.setdefault(record.year, set()).add(record.id)
+        self._next_id = max(self._next_id, record.id + 1)
+
+    def _remove(self, book_id: int) -> Optional[BookRecord]:
+        record = self._by_id.pop(book_id, None)
+        if record is None:
+            return None
+        del self._ids[bisect_left(self._ids, book_id)]
+        authors = self._by_author[record.author]
+        authors.discard(book_id)
+        if not authors:
+            del self._by_author[record.author]
+            del self._author_words[record.author]
+        years = self._by_year[record.year]
+        years.discard(book_id)
+        if not years:
+            del self._by_year[record.year]
+        return record
+
+    def _put(self, row: Dict[str, Any]) -> None:
+        self._remove(row["id"])
+        self._add(BookRecord(row["id"], row["title"], row["author"], row.get("year")))
+
+    @property
+    def writes_to_sqlite(self) -> bool:
+        return self.write_through
+
+    async def page(self, after_id: int, limit: int) -> Sequence[BookRow]:
+        start = bisect_right(self._ids, after_id)
+        return [self._by_id[book_id].row() for book_id in self._ids[start:start + limit]]
+
+    async def iter_rows(self, chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[List[BookRow]]:
+        last_id = 0
+        while True:
+            rows = await self.page(last_id, chunk_size)
+            if not rows:
+                return
+            yield rows
+            last_id = rows[-1].id
+
+    def _matching(self, query: BookQuery, in_id_order: bool = False) -> Iterable[BookRecord]:
+        """Records matching `query`, narrowed through the year and author indexes before filtering."""
+        title_tokens = _tokens(query.title) if query.title else []
+        author_tokens = _tokens(query.author) if query.author else []
+        if (query.title and not title_tokens) or (query.author and not author_tokens):
+            return []  # nothing searchable in a term, as in build_search_statement
+
+        low = query.year_from if query.year_from is not None else float("-inf")
+        high = query.year_to if query.year_to is not None else float("inf")
+        candidates: Optional[Set[int]] = None
+        if query.year:
+            candidates = self._by_year.get(query.year, set())
+        elif query.year_from is not None or query.year_to is not None:
+            candidates = set().union(*(
+                ids for year, ids in self._by_year.items() if year is not None and low <= year <= high
+            ))
+        if author_tokens:
+            by_author = set().union(*(
+                self._by_author[author] for author, words in self._author_words.items()
+                if all(token in words for token in author_tokens)
+            ))
+            candidates = by_author if candidates is None else candidates & by_author
+
+        if candidates is None:
+            records: Iterable[BookRecord] = (self._by_id[book_id] for book_id in self._ids)
+        elif in_id_order:
+            records = (self._by_id[book_id] for book_id in sorted(candidates))
+        else:
+            records = map(self._by_id.__getitem__, candidates)
+        if query.year or query.year_from is not None or query.year_to is not None:
+            year = query.year
+            records = (r for r in records if r.year is not None and (not year or r.year == year) and low <= r.year <= high)
+        if title_tokens:
+            records = (r for r in records if all(token in r.words for token in title_tokens))
+        return records
+
+    async def search(self, query: BookQuery, sort: SearchSort, limit: Optional[int]) -> Sequence[BookRow]:
+        if sort is SearchSort.relevance:
+            # Matches come in ID order already, so a limit stops the scan early.
+            return [record.row() for record in islice(self._matching(query, in_id_order=True), limit)]
+        key, reverse = _SORT_KEYS[sort]
+        records = self._matching(query)
+        if limit is None:
+            ordered = sorted(records, key=key, reverse=reverse)
+        else:
+            ordered = (heapq.nlargest if reverse else heapq.nsmallest)(limit, records, key=key)
+        return [record.row() for record in ordered]
+
+    async def facets(self, query: BookQuery, top_authors: int) -> Dict:
+        by_decade: Dict[Optional[int], int] = {}
+        if query.is_empty():
+            by_author = {author: len(ids) for author, ids in self._by_author.items()}
+            for year, ids in self._by_year.items():
+                by_decade[decade_of(year)] = by_decade.get(decade_of(year), 0) + len(ids)
+        else:
+            by_author = {}
+            for record in self._matching(query):
+                by_author[record.author] = by_author.get(record.author, 0) + 1
+                decade = decade_of(record.year)
+                by_decade[decade] = by_decade.get(decade, 0) + 1
+        top = heapq.nsmallest(top_authors, by_author.items(), key=lambda kv: (-kv[1], kv[0]))
+        return {
+            "total": sum(by_author.values()),
+            "authors": [{"author": name, "count": count} for name, count in top],
+            "decades": sorted_counts(by_decade, "decade"),
+        }
+
+    async def create(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        if self.write_through:
+            row = await self._sql.create(values)
+        else:
+            row = {"id": self._next_id, "title": values["title"], "author": values["author"], "year": values.get("year")}
+        self._put(row)
+        response_cache.invalidate()
+        return row
+
+    async def update(self, book_id: int, values: Dict[str, Any]) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        if self.write_through:
+            result = await self._sql.update(book_id, values)
+            if result is None:
+                return None
+            previous, row = result
+        else:
+            record = self._by_id.get(book_id)
+            if record is None:
+                return None
+            previous = record.row()._asdict()
+            row = {**previous, **values}
+        self._put(row)
+        response_cache.invalidate()
+        return previous, row
+
+    async def delete(self, book_id: int) -> Optional[Dict[str, Any]]:
+        if self.write_through:
+            row = await self._sql.delete(book_id)
+        else:
+            record = self._by_id.get(book_id)
+            row = record.row()._asdict() if record else None
+        if row is not None:
+            self._remove(book_id)
+            response_cache.invalidate()
+        return row
+
+    def apply_committed(self, changes: Iterable[Change]) -> None:
+        for old, new in changes:
+            if new is not None:
+                self._put(new)
+            elif old is not None:
+                self._remove(old["id"])
+        response_cache.invalidate()
+
+
+# BOOKS_STORAGE=memory serves reads from InMemoryBookRepository; BOOKS_MEMORY_WRITE_THROUGH=0 keeps
+# its writes out of SQLite.
+STORAGE = os.getenv("BOOKS_STORAGE", "sqlite")
+if STORAGE == "memory" and int(os.getenv("WEB_CONCURRENCY", "1")) > 1:
+    raise RuntimeError("BOOKS_STORAGE=memory keeps a copy of the catalog per process; run a single worker")
+memory_repository = (
+    InMemoryBookRepository(write_through=os.getenv("BOOKS_MEMORY_WRITE_THROUGH", "1") != "0")
+    if STORAGE == "memory" else None
+)
+_sql_repository = SqlBookRepository()
+_read_session = asynccontextmanager(get_read_db)
+
+
+async def get_repository() -> AsyncIterator[BookRepository]:
+    """Dependency for handlers that query the catalog: the configured repository, on a read session for SQLite."""
+    if memory_repository is not None:
+        yield memory_repository
+        return
+    async with _read_session() as db:
+        yield SqlBookRepository(db)
+
+
+def current_repository() -> BookRepository:
+    """Dependency for writes and streams, which need no request-scoped session."""
+    return memory_repository if memory_repository is not None else _sql_repository
@@ -0,0 +1,41 @@
+import json
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from fastapi import Response
+from sqlalchemy.engine import Row
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib encoder gives the same output, only slower
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    """Encode `content` as compact UTF-8 JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def rows_to_dicts(rows: Iterable[Row]) -> List[Dict[str, Any]]:
+    """Turn Core result rows into plain dicts without building ORM objects."""
+    rows = list(rows)
+    if not rows:
+        return []
+    keys: Sequence[str] = rows[0]._fields
+    return [dict(zip(keys, row)) for row in rows]
+
+
+class FastJSONResponse(Response):
+    """JSON response rendered with `dumps`.
+
+    Handlers return it directly for rows read straight from our own table, which skips
+    FastAPI's per-item response-model validation; the route's response_model still documents the shape.
+    """
+    media_type = "application/json"
+
+    def __init__(self, content: Any, status_code: int = 200, headers: Optional[Dict[str, str]] = None) -> None:
+        super().__init__(content, status_code=status_code, headers=headers)
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -1,31 +1,90 @@
+from dataclasses import dataclass
 from fastapi import APIRouter, Depends, Query, HTTPException
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, List, Optional
 
-from ..models import Book
-from ..database import get_db
-from ..schemas import Book as BookResponse
+from ..autocomplete import AutocompleteField, autocomplete
+from ..database import get_read_db
+from ..repository import BookQuery, BookRepository, get_repository
+from ..responses import FastJSONResponse, rows_to_dicts
+from ..schemas import AutocompleteSuggestion, Book as BookResponse, SearchFacets
+from ..search_index import SearchSort, explain_statement
 
 router = APIRouter(prefix="/books", tags=["books"])
 
+# Registered by create_app() only when BOOKS_DEBUG is set.
+debug_router = APIRouter(prefix="/books", tags=["debug"])
+
+
+@dataclass
+class SearchFilters:
+    """Query parameters shared by the search, facet and explain endpoints."""
+    book_title: Optional[str] = Query(None, description="Filter by words in the book title (word prefix match)")
+    author: Optional[str] = Query(None, description="Filter by words in the author name (word prefix match)")
+    year: Optional[int] = Query(None, description="Filter by publication year")
+    year_from: Optional[int] = Query(None, description="Published in or after this year")
+    year_to: Optional[int] = Query(None, description="Published in or before this year")
+
+    def query(self) -> BookQuery:
+        return BookQuery(self.book_title, self.author, self.year, self.year_from, self.year_to)
+
+
+SortQuery = Query(SearchSort.relevance, description="relevance, title, -title, year, -year or author")
+LimitQuery = Query(None, ge=1, le=10_000, description="Maximum number of books to return")
+
 
 @router.get("/search/", response_model=List[BookResponse])
 async def search_books(
-        book_title: Optional[str] = Query(None, description="Filter by book title (substring match)"),
-        author: Optional[str] = Query(None, description="Filter by author name (substring match)"),
-        year: Optional[int] = Query(None, description="Filter by publication year"),
-        db: Session = Depends(get_db),
+        filters: SearchFilters = Depends(),
+        sort: SearchSort = SortQuery,
+        limit: Optional[int] = LimitQuery,
+        books: BookRepository = Depends(get_repository),
 ) -> List[BookResponse]:
-    """Search for books by optional filters: title, author, and year."""
-    query = db.query(Book)
-    if book_title:
-        query = query.filter(Book.title.ilike(f"%{book_title}%"))
-    if author:
-        query = query.filter(Book.author.ilike(f"%{author}%"))
-    if year:
-        query = query.filter(Book.year == year)
-
-    results = query.all()
+    """Search for books by optional filters: title, author, and year, ranked by relevance or sorted."""
+    results = await books.search(filters.query(), sort, limit)
     if not results:
         raise HTTPException(status_code=404, detail="No books found")
-    return results
+    return FastJSONResponse(rows_to_dicts(results))
+
+
+@router.get("/autocomplete", response_model=List[AutocompleteSuggestion])
+async def autocomplete_books(
+        q: str = Query(..., min_length=1, max_length=255, description="What the user has typed so far"),
+        field: AutocompleteField = Query(AutocompleteField.all, description="all, title or author"),
+        limit: int = Query(10, ge=1, le=100, description="Maximum number of suggestions"),
+) -> List[AutocompleteSuggestion]:
+    """Titles and authors starting with `q` (case- and accent-insensitive), from the in-memory prefix index."""
+    if not autocomplete.enabled:
+        raise HTTPException(status_code=503, detail="Autocomplete is disabled")
+    return FastJSONResponse(autocomplete.suggest(q, field, limit))
+
+
+@router.get("/autocomplete/stats")
+async def autocomplete_stats() -> Dict:
+    """Size of the autocomplete index: distinct entries, array slots, tombstones and approximate memory."""
+    return autocomplete.stats()
+
+
+@router.get("/search/facets", response_model=SearchFacets)
+async def search_books_facets(
+        filters: SearchFilters = Depends(),
+        top_authors: int = Query(10, ge=0, le=1000, description="Number of author facets to return"),
+        books: BookRepository = Depends(get_repository),
+) -> SearchFacets:
+    """Author and decade facet counts for the same filters as /books/search/."""
+    return await books.facets(filters.query(), top_authors)
+
+
+@debug_router.get("/search/explain")
+async def explain_search(
+        filters: SearchFilters = Depends(),
+        sort: SearchSort = SortQuery,
+        limit: Optional[int] = LimitQuery,
+        db: AsyncSession = Depends(get_read_db),
+) -> Dict:
+    """SQL and EXPLAIN QUERY PLAN for a search, with a flag for plans that scan a whole table or index.
+
+    Always explains the SQLite statement, whichever repository serves the searches.
+    """
+    stmt = filters.query().statement(sort).limit(limit)
+    return await db.run_sync(lambda session: explain_statement(session.connection(), stmt))
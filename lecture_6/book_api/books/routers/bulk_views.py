@@ -0,0 +1,220 @@
+import json
+from functools import partial
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, AsyncIterator, Dict, List, Tuple, Type
+
+from ..autocomplete import Change, autocomplete
+from ..models import BOOK_COLUMNS, Book
+from ..repository import BookRepository, current_repository
+from ..schemas import BookBulkUpdate, BookCreate, BulkItemResult
+from ..write_queue import WriteQueueFull, write_queue
+
+
+def _require_sql_writes(books: BookRepository = Depends(current_repository)) -> None:
+    """Dependency refusing bulk writes when the repository keeps its writes out of SQLite (and allocates IDs itself)."""
+    if not books.writes_to_sqlite:
+        raise HTTPException(status_code=501, detail="Bulk writes need SQLite storage (BOOKS_MEMORY_WRITE_THROUGH=1)")
+
+
+router = APIRouter(prefix="/books/bulk", tags=["books"], dependencies=[Depends(_require_sql_writes)])
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+DEFAULT_BATCH_SIZE = 1000
+MAX_BATCH_SIZE = 10_000
+
+BatchSize = Query(DEFAULT_BATCH_SIZE, ge=1, le=MAX_BATCH_SIZE, description="Rows written per statement and transaction")
+
+
+def _array_of(schema: Type[BaseModel]) -> Dict[str, Any]:
+    """OpenAPI request body for endpoints that read a JSON array or an NDJSON stream themselves."""
+    item = schema.model_json_schema()
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": {"type": "array", "items": item}},
+                NDJSON_MEDIA_TYPE: {"schema": item},
+            },
+        }
+    }
+
+
+async def _iter_items(request: Request) -> AsyncIterator[Any]:
+    """Yield raw items from a JSON array body or, line by line, from an NDJSON upload."""
+    if request.headers.get("content-type", "").startswith(NDJSON_MEDIA_TYPE):
+        buffer = b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield _parse_line(line)
+        if buffer.strip():
+            yield _parse_line(buffer)
+        return
+
+    try:
+        payload = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Request body must be a JSON array")
+    if not isinstance(payload, list):
+        raise HTTPException(status_code=400, detail="Request body must be a JSON array")
+    for item in payload:
+        yield item
+
+
+def _parse_line(line: bytes) -> Any:
+    """Decode one NDJSON line; a malformed line is returned as the error so it is reported per item."""
+    try:
+        return json.loads(line)
+    except ValueError as exc:
+        return exc
+
+
+def _validation_detail(exc: Exception) -> str:
+    """Short, single-line description of why an item was rejected."""
+    if isinstance(exc, ValidationError):
+        return "; ".join(
+            f"{'.'.join(map(str, err['loc']))}: {err['msg']}" if err["loc"] else err["msg"] for err in exc.errors()
+        )
+    return f"Invalid JSON: {exc}"
+
+
+async def _run_batch(batch: List[Tuple[int, Any]], write, results: List[BulkItemResult]) -> None:
+    """Queue one batch as a single write operation; if it fails every item of the batch is marked failed.
+
+    Batches go through the write queue like single-book writes, so an upload only holds the write
+    connection while one of its batches is applied, not while the client is still sending. Writers
+    return the item results and the `(old, new)` rows that the in-memory repository and the
+    autocomplete index have to apply.
+    """
+    try:
+        batch_results, changes = await write_queue.submit(partial(write, batch=batch))
+    except WriteQueueFull:
+        detail = "Too many pending writes"
+    except SQLAlchemyError as exc:
+        detail = str(getattr(exc, "orig", exc))
+    else:
+        results.extend(batch_results)
+        current_repository().apply_committed(changes)
+        autocomplete.apply(changes)
+        return
+    results.extend(BulkItemResult(index=index, status="error", detail=detail) for index, _ in batch)
+
+
+async def _insert_books(
+        db: AsyncSession, batch: List[Tuple[int, BookCreate]]
+) -> Tuple[List[BulkItemResult], List[Change]]:
+    """Insert a batch with a single executemany-style INSERT ... RETURNING."""
+    rows = [book.model_dump() for _, book in batch]
+    result = await db.execute(insert(Book).returning(Book.id, sort_by_parameter_order=True), rows)
+    ids = result.scalars().all()
+    results = [BulkItemResult(index=index, status="created", id=book_id) for (index, _), book_id in zip(batch, ids)]
+    return results, [(None, {"id": book_id, **row}) for book_id, row in zip(ids, rows)]
+
+
+async def _update_books(
+        db: AsyncSession, batch: List[Tuple[int, BookBulkUpdate]]
+) -> Tuple[List[BulkItemResult], List[Change]]:
+    """Update a batch with executemany-style UPDATEs keyed by primary key; items with only an ID are left unchanged."""
+    ids = {item.id for _, item in batch}
+    existing = {
+        row.id: row._asdict()
+        for row in await db.execute(select(*BOOK_COLUMNS).where(Book.id.in_(ids)))
+    }
+
+    values = {index: item.model_dump(exclude_none=True) for index, item in batch}
+    rows = [values[index] for index, item in batch if item.id in existing and len(values[index]) > 1]
+    if rows:
+        await db.execute(update(Book), rows)
+    changes = []
+    for row in rows:
+        # Later items for the same ID see the earlier ones, as the UPDATEs do.
+        old = existing[row["id"]]
+        existing[row["id"]] = new = {**old, **row}
+        changes.append((old, new))
+    results = [
+        BulkItemResult(index=index, status=_update_status(item.id in existing, values[index]), id=item.id)
+        for index, item in batch
+    ]
+    return results, changes
+
+
+def _update_status(found: bool, values: Dict[str, Any]) -> str:
+    """Status of one update item; `values` always holds the ID, so a single key means nothing to write."""
+    if not found:
+        return "not_found"
+    return "updated" if len(values) > 1 else "unchanged"
+
+
+async def _delete_books(db: AsyncSession, batch: List[Tuple[int, int]]) -> Tuple[List[BulkItemResult], List[Change]]:
+    """Delete a batch with a single DELETE ... WHERE id IN (...) RETURNING the deleted rows."""
+    ids = [book_id for _, book_id in batch]
+    result = await db.execute(
+        delete(Book).where(Book.id.in_(ids)).returning(*BOOK_COLUMNS).execution_options(synchronize_session=False)
+    )
+    rows = [row._asdict() for row in result]
+    changes = [(row, None) for row in rows]
+    deleted = {row["id"] for row in rows}
+    results = []
+    for index, book_id in batch:
+        results.append(BulkItemResult(index=index, status="deleted" if book_id in deleted else "not_found", id=book_id))
+        deleted.discard(book_id)
+    return results, changes
+
+
+async def _process(request: Request, schema, write, batch_size: int) -> List[BulkItemResult]:
+    """Validate items one by one and write the valid ones in chunked transactions."""
+    results: List[BulkItemResult] = []
+    batch: List[Tuple[int, Any]] = []
+    index = 0
+    async for raw in _iter_items(request):
+        try:
+            if isinstance(raw, Exception):
+                raise raw
+            batch.append((index, schema.model_validate(raw)))
+        except ValueError as exc:
+            results.append(BulkItemResult(index=index, status="invalid", detail=_validation_detail(exc)))
+        index += 1
+        if len(batch) >= batch_size:
+            await _run_batch(batch, write, results)
+            batch = []
+    if batch:
+        await _run_batch(batch, write, results)
+    results.sort(key=lambda item: item.index)
+    return results
+
+
+@router.post("", response_model=List[BulkItemResult], openapi_extra=_array_of(BookCreate))
+async def add_books_in_bulk(
+        request: Request,
+        batch_size: int = BatchSize,
+) -> List[BulkItemResult]:
+    """Create many books from a JSON array or a streamed NDJSON upload."""
+    return await _process(request, BookCreate, _insert_books, batch_size)
+
+
+@router.patch("", response_model=List[BulkItemResult], openapi_extra=_array_of(BookBulkUpdate))
+async def update_books_in_bulk(
+        request: Request,
+        batch_size: int = BatchSize,
+) -> List[BulkItemResult]:
+    """Update many books; each item carries the book ID and the fields to change."""
+    return await _process(request, BookBulkUpdate, _update_books, batch_size)
+
+
+@router.post("/delete", response_model=List[BulkItemResult])
+async def delete_books_in_bulk(
+        ids: List[int] = Body(..., description="IDs of the books to delete"),
+        batch_size: int = BatchSize,
+) -> List[BulkItemResult]:
+    """Delete many books by ID."""
+    results: List[BulkItemResult] = []
+    for start in range(0, len(ids), batch_size):
+        batch = list(enumerate(ids[start:start + batch_size], start=start))
+        await _run_batch(batch, _delete_books, results)
+    return results
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from ..export import (
+    EXPORT_CHUNK_SIZE,
+    ExportCompression,
+    ExportFormat,
+    ExportUnavailable,
+    filename,
+    iter_export,
+    media_type,
+    open_export,
+)
+from ..repository import BookRepository, current_repository
+
+router = APIRouter(prefix="/books/export", tags=["books"])
+
+
+@router.get("", response_class=StreamingResponse)
+async def export_books(
+        format: ExportFormat = Query(ExportFormat.ndjson, description="Output format"),
+        compression: ExportCompression = Query(
+            ExportCompression.none, description="gzip/zstd wrap CSV and NDJSON; Parquet and Arrow compress columns"
+        ),
+        chunk_size: int = Query(EXPORT_CHUNK_SIZE, ge=100, le=100_000, description="Rows read per database round-trip"),
+        books: BookRepository = Depends(current_repository),
+) -> StreamingResponse:
+    """Stream the whole catalog as a file, reading the table in chunks so memory stays constant."""
+    try:
+        encoder, compressor = open_export(format, compression)
+    except ExportUnavailable as exc:
+        raise HTTPException(status_code=501, detail=str(exc))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return StreamingResponse(
+        iter_export(encoder, compressor, chunks=books.iter_rows(chunk_size)),
+        media_type=media_type(format, compression),
+        headers={"Content-Disposition": f'attachment; filename="{filename(format, compression)}"'},
+    )
@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+
+from ..maintenance import maintenance
+from ..schemas import MaintenanceStatus
+
+router = APIRouter(prefix="/books/maintenance", tags=["books"])
+
+
+@router.get("", response_model=MaintenanceStatus)
+async def get_maintenance_status() -> MaintenanceStatus:
+    """When database maintenance last ran, how long it took and what each step did."""
+    return maintenance.status()
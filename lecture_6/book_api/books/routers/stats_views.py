@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import get_read_db
+from ..schemas import AuthorCount, CatalogStats
+from ..stats import author_count, catalog_stats
+
+router = APIRouter(prefix="/books/stats", tags=["books"])
+
+
+@router.get("", response_model=CatalogStats)
+async def get_catalog_stats(
+        top_authors: int = Query(10, ge=0, le=1000, description="Number of most prolific authors to include"),
+        db: AsyncSession = Depends(get_read_db),
+) -> CatalogStats:
+    """Book counts per year, per decade and for the top authors, without scanning the books table."""
+    return await catalog_stats(db, top_authors)
+
+
+@router.get("/authors/{author}", response_model=AuthorCount)
+async def get_author_stats(author: str, db: AsyncSession = Depends(get_read_db)) -> AuthorCount:
+    """Number of books by one author (exact name)."""
+    return {"author": author, "count": await author_count(db, author)}
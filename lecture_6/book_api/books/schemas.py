@@ -1,5 +1,6 @@
+from datetime import datetime
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 
 class BookBase(BaseModel):
@@ -35,3 +36,71 @@ class Book(BookBase):
 
     class Config:
         orm_mode = True
+
+
+class BookBulkUpdate(BookUpdate):
+    """Schema for one item of a bulk update: the book ID plus the fields to change."""
+    id: int = Field(..., ge=1)
+
+
+class BulkItemResult(BaseModel):
+    """Outcome of a single item in a bulk request."""
+    index: int = Field(..., description="Position of the item in the request")
+    status: str = Field(..., description="created, updated, unchanged, deleted, not_found, invalid or error")
+    id: Optional[int] = None
+    detail: Optional[str] = None
+
+
+class AuthorCount(BaseModel):
+    """Number of books by one author."""
+    author: str
+    count: int
+
+
+class YearCount(BaseModel):
+    """Number of books published in one year; year is null for books without a year."""
+    year: Optional[int]
+    count: int
+
+
+class DecadeCount(BaseModel):
+    """Number of books published in one decade (e.g. 1990); decade is null for books without a year."""
+    decade: Optional[int]
+    count: int
+
+
+class CatalogStats(BaseModel):
+    """Catalog-wide counts served from the aggregate tables."""
+    total: int
+    by_year: List[YearCount]
+    by_decade: List[DecadeCount]
+    top_authors: List[AuthorCount]
+
+
+class SearchFacets(BaseModel):
+    """Facet counts for a search."""
+    total: int
+    authors: List[AuthorCount]
+    decades: List[DecadeCount]
+
+
+class AutocompleteSuggestion(BaseModel):
+    """One autocomplete suggestion: a title or author as stored, and how many books use it."""
+    value: str
+    field: str = Field(..., description="title or author")
+    books: int
+
+
+class MaintenanceStatus(BaseModel):
+    """State of the background database maintenance and what its last pass did."""
+    enabled: bool
+    scheduled: bool = Field(..., description="Whether the background task that starts the passes is alive")
+    running: bool = Field(..., description="Whether a pass is in progress right now")
+    interval_seconds: float
+    runs: int = Field(..., description="Passes since start-up")
+    last_run_at: Optional[datetime] = None
+    last_duration_ms: Optional[float] = None
+    last_error: Optional[str] = None
+    last_steps: Dict[str, Dict[str, Any]] = Field(
+        default_factory=dict, description="Per step (analyze, vacuum, checkpoint): what it found and did"
+    )
@@ -0,0 +1,134 @@
+import re
+from enum import Enum
+from typing import Dict, List, Optional
+
+from sqlalchemy import Select, column, false, func, literal_column, select, table, text
+from sqlalchemy.engine import Connection
+
+from .models import BOOK_COLUMNS, Book
+
+FTS_TABLE = "books_fts"
+
+# External-content FTS5 table: the text lives in `books`, the index only stores tokens.
+_CREATE_FTS = f"""
+CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+    title, author,
+    content='books', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='2 3'
+)
+"""
+
+# Triggers keep the index in sync with every insert, update and delete on `books`.
+_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS books_fts_ai AFTER INSERT ON books BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, author) VALUES (new.id, new.title, new.author);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS books_fts_ad AFTER DELETE ON books BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, author) VALUES ('delete', old.id, old.title, old.author);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS books_fts_au AFTER UPDATE OF title, author ON books BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, author) VALUES ('delete', old.id, old.title, old.author);
+        INSERT INTO {FTS_TABLE}(rowid, title, author) VALUES (new.id, new.title, new.author);
+    END
+    """,
+]
+
+# Words of a search term; the in-memory repository splits titles and authors the same way.
+TOKEN_RE = re.compile(r"\w+")
+
+
+class SearchSort(str, Enum):
+    relevance = "relevance"
+    title = "title"
+    title_desc = "-title"
+    year = "year"
+    year_desc = "-year"
+    author = "author"
+
+
+# Orders that the composite indexes can deliver without a sort step (see Book.__table_args__).
+_SORT_ORDERS = {
+    SearchSort.title: (Book.title, Book.id),
+    SearchSort.title_desc: (Book.title.desc(), Book.id.desc()),
+    SearchSort.year: (Book.year, Book.title, Book.id),
+    SearchSort.year_desc: (Book.year.desc(), Book.title.desc(), Book.id.desc()),
+    SearchSort.author: (Book.author, Book.year, Book.id),
+}
+
+books_fts = table(FTS_TABLE, column("rowid"))
+
+
+def ensure_search_index(connection: Connection) -> None:
+    """Create the FTS5 index and its sync triggers, back-filling it from `books` on first run."""
+    exists = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": FTS_TABLE}
+    ).first()
+    if not exists:
+        connection.execute(text(_CREATE_FTS))
+        connection.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+    for trigger in _TRIGGERS:
+        connection.execute(text(trigger))
+
+
+def _column_clauses(column_name: str, term: str) -> List[str]:
+    """Turn a free-text term into prefix clauses restricted to one FTS column."""
+    return [f'{column_name} : "{token}"*' for token in TOKEN_RE.findall(term)]
+
+
+def build_search_statement(
+        title: Optional[str],
+        author: Optional[str],
+        year: Optional[int],
+        year_from: Optional[int] = None,
+        year_to: Optional[int] = None,
+        sort: SearchSort = SearchSort.relevance,
+) -> Select:
+    """Build the search SELECT: FTS5 token/prefix match plus exact or ranged year filters.
+
+    `relevance` orders text searches by bm25 (and everything else by ID); other sorts follow the
+    composite indexes so that year-filtered queries can be answered in index order.
+    """
+    stmt = select(*BOOK_COLUMNS)
+    clauses: List[str] = []
+    for column_name, term in (("title", title), ("author", author)):
+        if term:
+            term_clauses = _column_clauses(column_name, term)
+            if not term_clauses:
+                # Nothing searchable in the term (e.g. only punctuation): no book can match.
+                return stmt.where(false())
+            clauses.extend(term_clauses)
+
+    if clauses:
+        fts = literal_column(FTS_TABLE)
+        stmt = stmt.join(books_fts, books_fts.c.rowid == Book.id).where(fts.op("MATCH")(" AND ".join(clauses)))
+        if sort is SearchSort.relevance:
+            stmt = stmt.order_by(func.bm25(fts, 2.0, 1.0), Book.id)
+    if sort is not SearchSort.relevance:
+        stmt = stmt.order_by(*_SORT_ORDERS[sort])
+    elif not clauses:
+        stmt = stmt.order_by(Book.id)
+
+    if year:
+        stmt = stmt.where(Book.year == year)
+    if year_from is not None:
+        stmt = stmt.where(Book.year >= year_from)
+    if year_to is not None:
+        stmt = stmt.where(Book.year <= year_to)
+    return stmt
+
+
+def explain_statement(connection: Connection, stmt: Select) -> Dict:
+    """Run EXPLAIN QUERY PLAN for `stmt` and flag plans that scan a whole table or index."""
+    compiled = stmt.compile(dialect=connection.dialect)
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params).all()
+    plan = [row[-1] for row in rows]
+    # "SCAN books_fts VIRTUAL TABLE INDEX ..." is an FTS index lookup, not a table scan.
+    full_scan = any(step.startswith("SCAN ") and "VIRTUAL TABLE" not in step for step in plan)
+    return {"sql": str(compiled), "params": list(params), "plan": plan, "full_scan": full_scan}
@@ -0,0 +1,131 @@
+from typing import Dict, List, Optional
+
+from sqlalchemy import Select, func, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import AuthorStats, YearStats
+
+UNKNOWN_YEAR = 0
+
+# Every write to `books`, whichever code path issues it, adjusts the aggregates in the same transaction.
+_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS book_stats_ai AFTER INSERT ON books BEGIN
+        INSERT INTO book_author_stats(author, book_count) VALUES (new.author, 1)
+            ON CONFLICT(author) DO UPDATE SET book_count = book_count + 1;
+        INSERT INTO book_year_stats(year, book_count) VALUES (COALESCE(new.year, {UNKNOWN_YEAR}), 1)
+            ON CONFLICT(year) DO UPDATE SET book_count = book_count + 1;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS book_stats_ad AFTER DELETE ON books BEGIN
+        UPDATE book_author_stats SET book_count = book_count - 1 WHERE author = old.author;
+        DELETE FROM book_author_stats WHERE author = old.author AND book_count <= 0;
+        UPDATE book_year_stats SET book_count = book_count - 1 WHERE year = COALESCE(old.year, {UNKNOWN_YEAR});
+        DELETE FROM book_year_stats WHERE year = COALESCE(old.year, {UNKNOWN_YEAR}) AND book_count <= 0;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS book_stats_au AFTER UPDATE OF author, year ON books BEGIN
+        UPDATE book_author_stats SET book_count = book_count - 1 WHERE author = old.author;
+        DELETE FROM book_author_stats WHERE author = old.author AND book_count <= 0;
+        INSERT INTO book_author_stats(author, book_count) VALUES (new.author, 1)
+            ON CONFLICT(author) DO UPDATE SET book_count = book_count + 1;
+        UPDATE book_year_stats SET book_count = book_count - 1 WHERE year = COALESCE(old.year, {UNKNOWN_YEAR});
+        DELETE FROM book_year_stats WHERE year = COALESCE(old.year, {UNKNOWN_YEAR}) AND book_count <= 0;
+        INSERT INTO book_year_stats(year, book_count) VALUES (COALESCE(new.year, {UNKNOWN_YEAR}), 1)
+            ON CONFLICT(year) DO UPDATE SET book_count = book_count + 1;
+    END
+    """,
+]
+
+
+def ensure_stats(connection: Connection) -> None:
+    """Create the aggregate triggers, rebuilding the aggregates if the triggers were missing."""
+    exists = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'book_stats_ai'")
+    ).first()
+    for trigger in _TRIGGERS:
+        connection.execute(text(trigger))
+    if not exists:
+        rebuild_stats(connection)
+
+
+def rebuild_stats(connection: Connection) -> None:
+    """Recompute the aggregate tables from `books` with a full scan; used for repairs."""
+    connection.execute(text("DELETE FROM book_author_stats"))
+    connection.execute(text("DELETE FROM book_year_stats"))
+    connection.execute(text(
+        "INSERT INTO book_author_stats(author, book_count) SELECT author, COUNT(*) FROM books GROUP BY author"
+    ))
+    connection.execute(text(
+        f"INSERT INTO book_year_stats(year, book_count) "
+        f"SELECT COALESCE(year, {UNKNOWN_YEAR}), COUNT(*) FROM books GROUP BY COALESCE(year, {UNKNOWN_YEAR})"
+    ))
+
+
+def decade_of(year: Optional[int]) -> Optional[int]:
+    """The decade a year falls in (1994 -> 1990); None for books without a year."""
+    return None if year is None else year // 10 * 10
+
+
+def sorted_counts(counts: Dict, key: str) -> List[Dict]:
+    """Turn {value: count} into a list of dicts, ordered by value with unknown (None) last."""
+    ordered = sorted(counts.items(), key=lambda item: (item[0] is None, item[0] or 0))
+    return [{key: value, "count": count} for value, count in ordered]
+
+
+async def catalog_stats(db: AsyncSession, top_authors: int) -> Dict:
+    """Totals per year and decade and the most prolific authors, read from the aggregate tables only."""
+    years = (await db.execute(select(YearStats.year, YearStats.book_count))).all()
+    by_year: Dict[Optional[int], int] = {}
+    by_decade: Dict[Optional[int], int] = {}
+    for year, count in years:
+        year = None if year == UNKNOWN_YEAR else year
+        by_year[year] = count
+        by_decade[decade_of(year)] = by_decade.get(decade_of(year), 0) + count
+
+    authors = await db.execute(
+        select(AuthorStats.author, AuthorStats.book_count)
+        .order_by(AuthorStats.book_count.desc(), AuthorStats.author)
+        .limit(top_authors)
+    )
+    return {
+        "total": sum(by_year.values()),
+        "by_year": sorted_counts(by_year, "year"),
+        "by_decade": sorted_counts(by_decade, "decade"),
+        "top_authors": [{"author": author, "count": count} for author, count in authors.all()],
+    }
+
+
+async def author_count(db: AsyncSession, author: str) -> int:
+    """Number of books by exactly `author` (primary-key lookup)."""
+    count = await db.scalar(select(AuthorStats.book_count).where(AuthorStats.author == author))
+    return count or 0
+
+
+async def search_facets(db: AsyncSession, search: Optional[Select], top_authors: int) -> Dict:
+    """Facet counts for a search statement; without one (no filters) they come straight from the aggregates."""
+    if search is None:
+        stats = await catalog_stats(db, top_authors)
+        return {"total": stats["total"], "authors": stats["top_authors"], "decades": stats["by_decade"]}
+
+    # With filters, group only the matching rows: the cost follows the number of matches.
+    matches = search.order_by(None).subquery()
+    decade = (matches.c.year // 10 * 10).label("decade")
+    rows = (await db.execute(
+        select(matches.c.author, decade, func.count()).group_by(matches.c.author, decade)
+    )).all()
+
+    by_author: Dict[str, int] = {}
+    by_decade: Dict[Optional[int], int] = {}
+    for row_author, row_decade, count in rows:
+        by_author[row_author] = by_author.get(row_author, 0) + count
+        by_decade[row_decade] = by_decade.get(row_decade, 0) + count
+    top = sorted(by_author.items(), key=lambda kv: (-kv[1], kv[0]))[:top_authors]
+    return {
+        "total": sum(by_author.values()),
+        "authors": [{"author": name, "count": count} for name, count in top],
+        "decades": sorted_counts(by_decade, "decade"),
+    }
@@ -0,0 +1,194 @@
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, List, NamedTuple, Optional, Tuple, TypeVar
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from .cache import response_cache
+from .database import AsyncSessionLocal, checkout
+from .metrics import (
+    RequestStats,
+    WRITE_BATCH_DURATION,
+    WRITE_BATCH_SIZE,
+    WRITE_QUEUE_REJECTED,
+    attributed_to,
+    current_request_stats,
+)
+
+T = TypeVar("T")
+WriteOperation = Callable[[AsyncSession], Awaitable[T]]
+
+
+class WriteQueueFull(Exception):
+    """Raised when a write could not be queued within the enqueue timeout (backpressure)."""
+
+
+class _ReplayIsolated(Exception):
+    """An operation failed on the fast path; the group is replayed with one savepoint per operation."""
+
+
+class _PendingWrite(NamedTuple):
+    operation: WriteOperation
+    future: "asyncio.Future[Any]"
+    # The submitting request's SQL accounting; the writer task runs outside that request's context.
+    stats: Optional[RequestStats]
+
+
+class WriteQueue:
+    """Single writer that applies queued operations in group commits.
+
+    Handlers submit a coroutine function taking a session; the writer collects operations until
+    `max_batch` are waiting or `max_delay_ms` has passed since the first one and commits them as one
+    transaction. Writes that arrive while a group is committing form the next group, so the default
+    delay of 0 already batches under load without slowing down a lone writer. A failing operation
+    only affects its own caller (see `_apply`), which means operations must be safe to run twice.
+    Results are handed out after the commit, so a caller never sees a write that is not durable yet.
+    The SQL an operation runs is counted towards the request that submitted it (see metrics.RequestStats).
+
+    The queue is bounded: when `max_pending` operations are waiting, `submit` waits up to
+    `enqueue_timeout` seconds for room and then raises WriteQueueFull. The writer is per process;
+    with several workers the busy timeout still arbitrates between their group commits.
+    """
+
+    def __init__(
+            self,
+            session_factory: async_sessionmaker,
+            max_batch: int = 64,
+            max_delay_ms: float = 0.0,
+            max_pending: int = 1024,
+            enqueue_timeout: float = 5.0,
+    ) -> None:
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.max_delay_ms = max_delay_ms
+        self.max_pending = max_pending
+        self.enqueue_timeout = enqueue_timeout
+        self._queue: Optional["asyncio.Queue[_PendingWrite]"] = None
+        self._writer: Optional["asyncio.Task[None]"] = None
+
+    @property
+    def running(self) -> bool:
+        return self._writer is not None and not self._writer.done()
+
+    async def start(self) -> None:
+        """Start the writer task on the running event loop."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._writer = asyncio.create_task(self._run(), name="book_api-write-queue")
+
+    async def stop(self) -> None:
+        """Commit everything already queued, then stop the writer."""
+        if not self.running:
+            return
+        await self._queue.join()
+        self._writer.cancel()
+        try:
+            await self._writer
+        except asyncio.CancelledError:
+            pass
+        self._writer = None
+
+    async def submit(self, operation: WriteOperation) -> T:
+        """Queue `operation` and wait for the result it returned once its group has committed."""
+        if not self.running:
+            raise RuntimeError("Write queue is not running; it is started by the application lifespan")
+        future = asyncio.get_running_loop().create_future()
+        try:
+            await asyncio.wait_for(
+                self._queue.put(_PendingWrite(operation, future, current_request_stats())), self.enqueue_timeout
+            )
+        except asyncio.TimeoutError:
+            WRITE_QUEUE_REJECTED.inc()
+            raise WriteQueueFull(f"More than {self.max_pending} writes are waiting")
+        return await future
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            deadline = time.monotonic() + self.max_delay_ms / 1000
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await self._commit_group(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _commit_group(self, batch: List[_PendingWrite]) -> None:
+        """Apply one group in a single transaction and settle every caller's future."""
+        start = time.perf_counter()
+        pending = [item for item in batch if not item.future.done()]
+        try:
+            try:
+                outcomes = await self._apply(pending, isolate=False)
+            except _ReplayIsolated:
+                outcomes = await self._apply(pending, isolate=True)
+        except Exception as exc:
+            # The transaction itself failed (e.g. the lock wait timed out): nothing in the group was written.
+            for item in pending:
+                if not item.future.done():
+                    item.future.set_exception(exc)
+            return
+        finally:
+            WRITE_BATCH_SIZE.observe(len(batch))
+            WRITE_BATCH_DURATION.observe(time.perf_counter() - start)
+
+        if any(ok for ok, _ in outcomes):
+            response_cache.invalidate()
+        for item, (ok, value) in zip(pending, outcomes):
+            if item.future.done():
+                continue  # the caller went away; its write is committed regardless
+            if ok:
+                item.future.set_result(value)
+            else:
+                item.future.set_exception(value)
+
+    async def _apply(self, pending: List[_PendingWrite], isolate: bool) -> List[Tuple[bool, Any]]:
+        """Run the operations in one transaction and commit it.
+
+        The fast path runs them back to back; the first failure rolls the whole group back and it is
+        replayed with a SAVEPOINT around each operation, so only the failing ones are discarded.
+        """
+        outcomes: List[Tuple[bool, Any]] = []
+        async with self.session_factory() as db:
+            await checkout(db, "write")
+            # Take the write lock up front (and wait on busy_timeout here) instead of mid-group.
+            await db.execute(text("BEGIN IMMEDIATE"))
+            for item in pending:
+                try:
+                    with attributed_to(item.stats):
+                        if isolate:
+                            async with db.begin_nested():
+                                outcomes.append((True, await item.operation(db)))
+                        else:
+                            outcomes.append((True, await item.operation(db)))
+                except Exception as exc:
+                    if not isolate:
+                        await db.rollback()
+                        raise _ReplayIsolated() from exc
+                    outcomes.append((False, exc))
+            await db.commit()
+        return outcomes
+
+
+write_queue = WriteQueue(
+    AsyncSessionLocal,
+    max_batch=int(os.getenv("BOOKS_WRITE_BATCH_MAX_OPS", "64")),
+    max_delay_ms=float(os.getenv("BOOKS_WRITE_BATCH_MAX_DELAY_MS", "0")),
+    max_pending=int(os.getenv("BOOKS_WRITE_QUEUE_SIZE", "1024")),
+    enqueue_timeout=float(os.getenv("BOOKS_WRITE_QUEUE_TIMEOUT", "5")),
+)
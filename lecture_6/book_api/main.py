@@ -1,20 +1,68 @@
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
 
-from .books.models import Base
-from .books.database import engine
+from .books.cache import ResponseCacheMiddleware, response_cache
+from .books.lifecycle import build_autocomplete, dispose_engines, init_schema, load_repository, warm_up
+from .books.maintenance import maintenance
+from .books.metrics import MetricsMiddleware, render_metrics
+from .books.write_queue import write_queue
 
 from .books.crud import router as books_crud
-from .books.routers.books_views import router as books_router
+from .books.routers.books_views import debug_router as books_debug_router, router as books_router
+from .books.routers.bulk_views import router as books_bulk_router
+from .books.routers.stats_views import router as books_stats_router
+from .books.routers.export_views import router as books_export_router
+from .books.routers.maintenance_views import router as books_maintenance_router
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Prepare the database before the first request and release connections on shutdown."""
+    await run_in_threadpool(init_schema)
+    await run_in_threadpool(build_autocomplete)
+    await run_in_threadpool(load_repository)
+    await warm_up()
+    await write_queue.start()
+    await maintenance.start()
+    yield
+    await maintenance.stop()
+    await write_queue.stop()
+    await dispose_engines()
+
+
+def create_app() -> FastAPI:
+    """Build the application; all database work happens in the lifespan, not at import time."""
+    app = FastAPI(lifespan=lifespan)
+    # Register routers
+    app.include_router(books_crud, tags=["books"])
+    app.include_router(books_router, tags=["books"])
+    app.include_router(books_bulk_router, tags=["books"])
+    app.include_router(books_stats_router, tags=["books"])
+    app.include_router(books_export_router, tags=["books"])
+    app.include_router(books_maintenance_router, tags=["books"])
+    if os.getenv("BOOKS_DEBUG"):
+        app.include_router(books_debug_router)
+    # Cache the read-mostly endpoints; write handlers invalidate it
+    app.add_middleware(ResponseCacheMiddleware, cache=response_cache, paths={"/books/", "/books/search/"})
+    # Outermost, so cache hits are measured too
+    app.add_middleware(MetricsMiddleware)
+
+    # Healthcheck endpoint
+    @app.get("/healthcheck")
+    async def healthcheck() -> dict:
+        return {"status": "ok"}
+
+    # Prometheus metrics endpoint
+    @app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+    async def metrics() -> PlainTextResponse:
+        return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
 
-app = FastAPI()
-# Register routers
-app.include_router(books_crud, tags=["books"])
-app.include_router(books_router, tags=["books"])
-# Initialize database
-Base.metadata.create_all(bind=engine)
+    return app
 
 
-# Healthcheck endpoint
-@app.get("/healthcheck")
-async def healthcheck() -> dict:
-    return {"status": "ok"}
+app = create_app()
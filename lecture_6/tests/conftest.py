@@ -0,0 +1,20 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# book_api reads its configuration at import time: point it at a throw-away database first.
+os.environ["BOOKS_DB_PATH"] = os.path.join(tempfile.mkdtemp(), "books.db")
+os.environ.setdefault("BOOKS_MAINTENANCE_INTERVAL", "0")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from book_api.main import app  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as client:
+        yield client
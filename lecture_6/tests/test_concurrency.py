@@ -0,0 +1,44 @@
+import asyncio
+import time
+
+import httpx
+from sqlalchemy import event
+
+from benchmarks.concurrency import max_overlap, seed
+from book_api.books.database import read_engine
+from book_api.main import app
+
+REQUESTS = 8
+
+
+def test_concurrent_searches_overlap_in_the_database(client):
+    """Searches run on the async read pool, so their statements are in flight together rather than queued."""
+    seed(5_000)
+    started: dict[int, float] = {}
+    intervals: list[tuple[float, float]] = []
+
+    def before(conn, cursor, statement, parameters, context, executemany):
+        started[id(context)] = time.perf_counter()
+
+    def after(conn, cursor, statement, parameters, context, executemany):
+        intervals.append((started.pop(id(context)), time.perf_counter()))
+
+    async def search_concurrently() -> list[httpx.Response]:
+        # Runs on the event loop of the app's lifespan, which owns the pooled aiosqlite connections.
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            # A distinct limit per request keeps the response cache out of the way.
+            return await asyncio.gather(*(
+                http.get("/books/search/", params={"book_title": "prog", "limit": 100 + i}) for i in range(REQUESTS)
+            ))
+
+    event.listen(read_engine.sync_engine, "before_cursor_execute", before)
+    event.listen(read_engine.sync_engine, "after_cursor_execute", after)
+    try:
+        responses = client.portal.call(search_concurrently)
+    finally:
+        event.remove(read_engine.sync_engine, "before_cursor_execute", before)
+        event.remove(read_engine.sync_engine, "after_cursor_execute", after)
+
+    assert [response.status_code for response in responses] == [200] * REQUESTS
+    assert max_overlap(intervals) > 1
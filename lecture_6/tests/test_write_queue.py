@@ -0,0 +1,18 @@
+import re
+
+
+def sql_statements(metrics: str, method: str, route: str) -> float:
+    match = re.search(
+        rf'^book_api_request_sql_statements_sum\{{method="{method}",route="{re.escape(route)}"\}} (\S+)$', metrics, re.M
+    )
+    return float(match.group(1)) if match else 0.0
+
+
+def test_queued_writes_count_their_sql_towards_the_request(client):
+    before = client.get("/metrics").text
+    book = client.post("/books/", json={"title": "Counted", "author": "Metrics", "year": 2001}).json()
+    client.put(f"/books/{book['id']}", json={"year": 2002})
+    after = client.get("/metrics").text
+
+    assert sql_statements(after, "POST", "/books/") > sql_statements(before, "POST", "/books/")
+    assert sql_statements(after, "PUT", "/books/{book_id}") > sql_statements(before, "PUT", "/books/{book_id}")